@@ -0,0 +1,212 @@
+import numpy as np
+
+from schedule_core import PRIORITIES
+
+# Vectorised study statistics over a session history. Everything works on
+# flat NumPy columns (minutes since the schedule epoch) so a year of
+# history for a whole class is a handful of array passes, and results are
+# plain arrays that matplotlib can plot directly.
+
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# The epoch (1970-01-01) was a Thursday; shifting by three days makes
+# Monday the first row of weekly views.
+_MONDAY_SHIFT = 3 * MINUTES_PER_DAY
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+BREAK_CATEGORIES = ("Water Break", "Food Break")
+
+
+class SessionArrays:
+    # Start-ordered columns plus the label tables that decode them.
+    def __init__(self, start, end, task, priority, category,
+                 tasks, priorities, categories):
+        order = np.argsort(start, kind='stable')
+        self.start = np.asarray(start, dtype=np.int64)[order]
+        self.end = np.asarray(end, dtype=np.int64)[order]
+        self.task = np.asarray(task, dtype=np.int64)[order]
+        self.priority = np.asarray(priority, dtype=np.int64)[order]
+        self.category = np.asarray(category, dtype=np.int64)[order]
+        self.tasks = list(tasks)
+        self.priorities = list(priorities)
+        self.categories = list(categories)
+
+    @classmethod
+    def from_schedule(cls, schedule):
+        columns = schedule.raw_columns()
+        alive = np.frombuffer(columns['alive'], dtype=np.uint8).astype(bool)
+        picked = {name: np.frombuffer(columns[name], dtype=columns[name].typecode)[alive]
+                  for name in ('start', 'end', 'task', 'priority', 'category')}
+        return cls(picked['start'], picked['end'], picked['task'], picked['priority'],
+                   picked['category'], schedule.tasks.values,
+                   schedule.priorities.values, schedule.categories.values)
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: (start, end, task, priority, category) with times in minutes,
+        # as produced by Schedule.rows().
+        tables = ({}, {}, {})
+        columns = ([], [], [], [], [])
+        for start, end, *labels in rows:
+            columns[0].append(start)
+            columns[1].append(end)
+            for table, column, label in zip(tables, columns[2:], labels):
+                column.append(table.setdefault(label, len(table)))
+        return cls(*columns, *(list(table) for table in tables))
+
+    def __len__(self):
+        return len(self.start)
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def code(self, table, label):
+        values = getattr(self, table)
+        return values.index(label) if label in values else -1
+
+    def codes(self, table, labels):
+        return [code for code in (self.code(table, label) for label in labels) if code >= 0]
+
+
+def _empty_days():
+    return np.array([], dtype='datetime64[D]')
+
+
+def _dates(day_numbers):
+    return np.datetime64('1970-01-01', 'D') + day_numbers.astype('timedelta64[D]')
+
+
+def minutes_by_subject(data, period='day'):
+    # Returns (period start dates, subject labels, [periods x subjects]
+    # minutes), crediting each session to the period it starts in.
+    if not len(data):
+        return _empty_days(), [], np.zeros((0, 0))
+    if period == 'day':
+        index = data.start // MINUTES_PER_DAY
+        scale = 1
+    elif period == 'week':
+        index = (data.start + _MONDAY_SHIFT) // MINUTES_PER_WEEK
+        scale = 7
+    else:
+        raise ValueError("period must be 'day' or 'week'")
+
+    first = index.min()
+    periods = index.max() - first + 1
+    subjects = len(data.tasks)
+    flat = np.bincount((index - first) * subjects + data.task,
+                       weights=data.duration, minlength=periods * subjects)
+    starts = (first + np.arange(periods)) * scale - (3 if period == 'week' else 0)
+    return _dates(starts), list(data.tasks), flat.reshape(periods, subjects)
+
+
+def daily_minutes(data, categories=("Study",)):
+    # (dates, minutes) per calendar day for the given categories, covering
+    # every day from the first to the last session.
+    codes = data.codes('categories', categories)
+    mask = np.isin(data.category, codes)
+    if not mask.any():
+        return _empty_days(), np.zeros(0)
+    day = data.start[mask] // MINUTES_PER_DAY
+    first = day.min()
+    totals = np.bincount(day - first, weights=data.duration[mask])
+    return _dates(first + np.arange(len(totals))), totals
+
+
+def focus_streaks(data, min_minutes=60, category="Study"):
+    # A day counts towards a streak once it has min_minutes of study.
+    # Returns (dates, streak length ending on each day, longest streak).
+    days, minutes = daily_minutes(data, (category,))
+    hit = minutes >= min_minutes
+    if not len(hit):
+        return days, np.zeros(0, dtype=np.int64), 0
+    count = np.cumsum(hit)
+    # Value of the running count at the most recent miss resets the streak
+    reset = np.maximum.accumulate(np.where(hit, 0, count))
+    streak = count - reset
+    return days, streak, int(streak.max())
+
+
+def break_ratio(data, breaks=BREAK_CATEGORIES, study=("Study",)):
+    # Break minutes per study minute, per day and overall.
+    days, break_minutes = daily_minutes(data, breaks)
+    study_days, study_minutes = daily_minutes(data, study)
+    if not len(days) or not len(study_days):
+        return _empty_days(), np.zeros(0), 0.0
+
+    first = min(days[0], study_days[0])
+    last = max(days[-1], study_days[-1])
+    span = int((last - first).astype(int)) + 1
+    breaks_full = np.zeros(span)
+    study_full = np.zeros(span)
+    breaks_full[(days - first).astype(int)] = break_minutes
+    study_full[(study_days - first).astype(int)] = study_minutes
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(study_full > 0, breaks_full / study_full, np.nan)
+    overall = breaks_full.sum() / study_full.sum() if study_full.sum() else 0.0
+    return first + np.arange(span).astype('timedelta64[D]'), ratio, float(overall)
+
+
+def hour_heatmap(data, categories=None):
+    # [7 weekdays x 24 hours] minutes, Monday first. Sessions are spread
+    # over every hour they actually cover, including past midnight.
+    mask = np.ones(len(data), dtype=bool)
+    if categories is not None:
+        mask = np.isin(data.category, data.codes('categories', categories))
+    start = (data.start[mask] + _MONDAY_SHIFT) % MINUTES_PER_WEEK
+    length = data.duration[mask]
+    whole_weeks = length // MINUTES_PER_WEEK
+    stop = start + length % MINUTES_PER_WEEK
+
+    # Difference array over the minutes of a week; spans that run past
+    # the end of the week wrap round to Monday 00:00.
+    wraps = stop > MINUTES_PER_WEEK
+    diff = np.bincount(start, minlength=MINUTES_PER_WEEK + 1)
+    diff -= np.bincount(np.minimum(stop, MINUTES_PER_WEEK), minlength=MINUTES_PER_WEEK + 1)
+    diff[0] += wraps.sum()
+    diff -= np.bincount(stop[wraps] - MINUTES_PER_WEEK, minlength=MINUTES_PER_WEEK + 1)
+
+    occupancy = np.cumsum(diff[:MINUTES_PER_WEEK]) + whole_weeks.sum()
+    return occupancy.reshape(7, 24, 60).sum(axis=2)
+
+
+def priority_compliance(data):
+    # A session is compliant when nothing of lower priority was scheduled
+    # before it on the same day. Returns (dates, daily share, overall share).
+    rank = np.full(len(data.priorities), len(PRIORITIES), dtype=np.int64)
+    for code, label in enumerate(data.priorities):
+        if label in PRIORITIES:
+            rank[code] = PRIORITIES.index(label)
+    if not len(data):
+        return _empty_days(), np.zeros(0), 1.0
+
+    level = rank[data.priority]
+    day = data.start // MINUTES_PER_DAY
+    # Data is start-ordered, so day is non-decreasing and a running max of
+    # day * width + level gives the worst level seen so far that day.
+    width = len(PRIORITIES) + 1
+    combined = day * width + level
+    seen = np.maximum.accumulate(combined)
+    # The sentinel sits on the day before the first, whatever its sign.
+    previous = np.concatenate(([(day[0] - 1) * width], seen[:-1]))
+    compliant = ~((previous // width == day) & (previous % width > level))
+
+    first = day.min()
+    counts = np.bincount(day - first)
+    good = np.bincount(day - first, weights=compliant)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(counts > 0, good / np.maximum(counts, 1), np.nan)
+    return _dates(first + np.arange(len(counts))), daily, float(compliant.mean())
+
+
+def summarize(data, streak_minutes=60):
+    days, streak, longest = focus_streaks(data, streak_minutes)
+    return {
+        'sessions': len(data),
+        'study_minutes': float(daily_minutes(data)[1].sum()),
+        'current_streak': int(streak[-1]) if len(streak) else 0,
+        'longest_streak': longest,
+        'break_ratio': break_ratio(data)[2],
+        'priority_compliance': priority_compliance(data)[2],
+        'busiest_hour': int(hour_heatmap(data).sum(axis=0).argmax()) if len(data) else None
+    }
@@ -0,0 +1,378 @@
+import argparse
+import asyncio
+import json
+import math
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from schedule_core import MAX_DURATION, PRIORITIES, Schedule, parse_duration
+from timers import AsyncioDriver, TimerService
+
+# Localhost HTTP/JSON API for kiosks and dashboards. One asyncio loop serves
+# every client (no thread per request); timers are driven by the same loop
+# and expirations are pushed to subscribers as server-sent events.
+#
+#   GET    /sessions?from=&to=&offset=&limit=   list, in start order
+#   POST   /sessions                            {task, duration, start?, priority?, category?}
+#   DELETE /sessions/<id>
+#   GET    /gaps?duration=&after=&count=        free slots
+#   GET    /timers
+#   POST   /timers                              {minutes | seconds, label?}
+#   DELETE /timers/<id>
+#   GET    /analytics
+#   GET    /events                              text/event-stream
+
+DEFAULT_PORT = 8765
+MAX_BODY = 1 << 20
+MAX_LIST = 1000
+MAX_LABEL = 64          # longest task or category name accepted
+MAX_TIMER_SECONDS = 7 * 24 * 3600
+HEARTBEAT_SECONDS = 15
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": message, **extra}
+
+
+def session_json(session):
+    return {"id": session.id, "start": session.start.isoformat(timespec="minutes"),
+            "end": session.end.isoformat(timespec="minutes"), "duration": session.duration,
+            "task": session.task, "priority": session.priority,
+            "category": session.category, "rule": session.rule}
+
+
+def timer_json(service, timer):
+    return {"id": timer.id, "label": timer.label, "duration": timer.duration,
+            "remaining": round(service.remaining(timer.id), 1), "state": timer.state}
+
+
+def _moment(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an ISO date or time") from None
+
+
+def _label(value, name, default=None):
+    if value is None and default is not None:
+        return default
+    if not isinstance(value, str):
+        raise HTTPError(400, f"{name} must be a string")
+    if not value.strip():
+        raise HTTPError(400, f"{name} is required")
+    if len(value.strip()) > MAX_LABEL:
+        raise HTTPError(400, f"{name} must be at most {MAX_LABEL} characters")
+    return value.strip()
+
+
+def _count(value, name, default):
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be a whole number") from None
+    if number < 0:
+        raise HTTPError(400, f"{name} must not be negative")
+    return number
+
+
+def _number(value, name, default=None):
+    if value is None:
+        if default is None:
+            raise HTTPError(400, f"{name} is required")
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be a number") from None
+    if not math.isfinite(number):
+        raise HTTPError(400, f"{name} must be a number")
+    if number <= 0:
+        raise HTTPError(400, f"{name} must be positive")
+    return number
+
+
+class ScheduleServer:
+    def __init__(self, schedule=None, timers=None):
+        self.schedule = schedule if schedule is not None else Schedule()
+        self.timers = timers or TimerService()
+        self.timers.on_expire = self._timer_expired
+        self._subscribers = set()
+        self._routes = {
+            ("GET", "sessions"): self.list_sessions,
+            ("POST", "sessions"): self.add_session,
+            ("DELETE", "sessions"): self.remove_session,
+            ("GET", "gaps"): self.gaps,
+            ("GET", "timers"): self.list_timers,
+            ("POST", "timers"): self.start_timer,
+            ("DELETE", "timers"): self.cancel_timer,
+            ("GET", "analytics"): self.analytics,
+        }
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        # Must be awaited inside the loop that will drive the timers.
+        AsyncioDriver(self.timers, asyncio.get_running_loop()).reschedule()
+        return await asyncio.start_server(self._serve, host, port)
+
+    # HTTP plumbing
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, query, body, keep_alive = request
+                if method == "GET" and path == ["events"]:
+                    await self._stream_events(writer)
+                    break
+                try:
+                    status, payload = self._dispatch(method, path, query, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, exc.body
+                except Exception as exc:
+                    # A bug must still answer the client rather than drop it
+                    status, payload = 500, {"error": f"internal error: {type(exc).__name__}"}
+                    keep_alive = False
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as exc:
+            await self._respond(writer, exc.status, exc.body, False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line") from None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "bad Content-Length") from None
+        if length > MAX_BODY:
+            raise HTTPError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        url = urlsplit(target)
+        path = [part for part in url.path.split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return method.upper(), path, query, body, keep_alive
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    def _dispatch(self, method, path, query, body):
+        if not path:
+            raise HTTPError(404, "not found")
+        handler = self._routes.get((method, path[0]))
+        if handler is None:
+            if any(resource == path[0] for _, resource in self._routes):
+                raise HTTPError(405, f"{method} not allowed on /{path[0]}")
+            raise HTTPError(404, "not found")
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "body must be JSON") from None
+            if not isinstance(data, dict):
+                raise HTTPError(400, "body must be a JSON object")
+        else:
+            data = {}
+        try:
+            return handler(path[1:], query, data)
+        except KeyError as exc:
+            raise HTTPError(404, f"no such id {exc.args[0]}") from None
+
+    def _item_id(self, rest):
+        if len(rest) != 1 or not rest[0].isdigit():
+            raise HTTPError(404, "expected /<resource>/<id>")
+        return int(rest[0])
+
+    # Sessions
+
+    def list_sessions(self, rest, query, data):
+        schedule = self.schedule
+        if rest:
+            return 200, session_json(schedule.get(self._item_id(rest)))
+        first = schedule.index_at(_moment(query["from"], "from")) if "from" in query else 0
+        last = schedule.index_at(_moment(query["to"], "to")) if "to" in query else len(schedule)
+        offset = first + _count(query.get("offset"), "offset", 0)
+        count = max(0, min(_count(query.get("limit"), "limit", MAX_LIST), MAX_LIST, last - offset))
+        return 200, {"total": max(0, last - first),
+                     "sessions": [session_json(session)
+                                  for session in schedule.window(offset, count)]}
+
+    def add_session(self, rest, query, data):
+        try:
+            duration = parse_duration(data.get("duration"))
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"duration must be a whole number of minutes from 1 to {MAX_DURATION}") from None
+        task = _label(data.get("task"), "task")
+        priority = data.get("priority", "Medium")
+        if priority not in PRIORITIES:
+            raise HTTPError(400, f"priority must be one of {', '.join(PRIORITIES)}")
+        category = _label(data.get("category"), "category", "Study")
+
+        schedule = self.schedule
+        if data.get("start"):
+            start = _moment(data["start"], "start")
+            conflicts = schedule.conflicts(start, duration)
+            if conflicts and not data.get("allow_overlap"):
+                gap = schedule.find_gap(duration, start)
+                raise HTTPError(409, "overlaps existing sessions",
+                                conflicts=[session_json(session) for session in conflicts],
+                                suggested_start=gap.isoformat(timespec="minutes"))
+        else:
+            start = schedule.next_start()
+        try:
+            sid = schedule.add(start, duration, task, priority, category)
+        except ValueError as exc:
+            raise HTTPError(400, str(exc)) from None
+        return 201, session_json(schedule.get(sid))
+
+    def remove_session(self, rest, query, data):
+        return 200, session_json(self.schedule.remove(self._item_id(rest)))
+
+    def gaps(self, rest, query, data):
+        try:
+            duration = parse_duration(query.get("duration"))
+        except ValueError:
+            raise HTTPError(400, f"duration must be a whole number of minutes from 1 to {MAX_DURATION}") from None
+        moment = _moment(query["after"], "after") if "after" in query else datetime.now()
+        found = []
+        for _ in range(min(_count(query.get("count"), "count", 1), 100)):
+            start = self.schedule.find_gap(duration, moment)
+            found.append({"start": start.isoformat(timespec="minutes"),
+                          "end": (start + timedelta(minutes=duration)).isoformat(timespec="minutes")})
+            moment = start + timedelta(minutes=duration)
+        return 200, {"gaps": found}
+
+    # Timers
+
+    def list_timers(self, rest, query, data):
+        return 200, {"timers": [timer_json(self.timers, timer) for timer in self.timers.timers()]}
+
+    def start_timer(self, rest, query, data):
+        if "seconds" in data:
+            seconds = _number(data["seconds"], "seconds")
+        else:
+            seconds = _number(data.get("minutes"), "minutes") * 60
+        if seconds > MAX_TIMER_SECONDS:
+            raise HTTPError(400, f"timers can run for at most {MAX_TIMER_SECONDS // 3600} hours")
+        tid = self.timers.start(seconds, str(data.get("label") or ""))
+        return 201, timer_json(self.timers, self.timers.get(tid))
+
+    def cancel_timer(self, rest, query, data):
+        timer = self.timers.cancel(self._item_id(rest))
+        return 200, {"id": timer.id, "label": timer.label}
+
+    def _timer_expired(self, timer):
+        # Nobody is at the server to dismiss the alarm, so the event is the
+        # only trace an expired timer leaves.
+        event = {"id": timer.id, "label": timer.label, "duration": timer.duration}
+        for queue in self._subscribers:
+            queue.put_nowait(("timer", event))
+        self.timers.dismiss(timer.id)
+
+    async def _stream_events(self, writer):
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+            await writer.drain()
+            while True:
+                try:
+                    name, event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                    writer.write(f"event: {name}\ndata: {json.dumps(event)}\n\n".encode())
+                except asyncio.TimeoutError:
+                    # Comments keep proxies from closing an idle stream and
+                    # surface disconnected clients.
+                    writer.write(b": keep-alive\n\n")
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+
+    # Analytics
+
+    def analytics(self, rest, query, data):
+        from analytics import SessionArrays, summarize
+
+        day = _moment(query["day"], "day").date() if "day" in query else datetime.now().date()
+        summary = summarize(SessionArrays.from_schedule(self.schedule))
+        return 200, {**summary,
+                     "category_totals": self.schedule.category_totals(),
+                     "priority_totals": self.schedule.priority_totals(),
+                     "day": day.isoformat(),
+                     "day_minutes": self.schedule.day_total(day, "Study"),
+                     "progress": self.schedule.progress(day)}
+
+
+async def serve(host, port, db=None):
+    schedule = Schedule()
+    store = None
+    if db:
+        from storage import ScheduleStore, day_window
+
+        store = ScheduleStore(db)
+        store.attach(schedule)
+        store.load_window(schedule, *day_window())
+        for _ in store.load_remaining(schedule, *day_window()):
+            pass
+
+    server = await ScheduleServer(schedule).start(host, port)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if store is not None:
+            store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pastel Student Scheduler JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=None, help="schedule database to serve and update")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.db))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+from planner import (DEFAULT_HOURS, EXHAUSTIVE_LIMIT, BreakRule, availability, free_time,
+                     parse_hours, plan, task_from_row)
+from schedule_core import Schedule
+from schedule_io import write_csv
+
+# Plans a whole tutoring centre at once: one task list per student, planned
+# and summarised independently in worker processes. Workers only see plain
+# data and results are written in student order, so a run depends on its
+# inputs and --start date, never on the worker count or finishing order.
+
+SUMMARY_FIELDS = ("student", "tasks", "sessions", "planned_minutes", "unplaced_minutes",
+                  "late_tasks", "study_minutes", "break_ratio", "priority_compliance",
+                  "busiest_hour", "error")
+SUMMARY_NAME = "summary"
+
+
+def student_name(name, where):
+    # Student names become file names in the output directory, so they
+    # may not be blank, leave it, or take the summary's place.
+    name = name.strip()
+    if not name:
+        raise ValueError(f"{where}: missing student name")
+    if name in (".", "..") or any(sep in name for sep in "/\\"):
+        raise ValueError(f"{where}: student name {name!r} cannot be used as a file name")
+    if name.lower() == SUMMARY_NAME:
+        raise ValueError(f"{where}: student name {name!r} is reserved for the summary")
+    return name
+
+
+def read_students(path):
+    # A directory holds one CSV per student, named after the student; a
+    # single CSV needs a student column. Returns sorted (student, tasks).
+    # Raises ValueError for input that does not name its students.
+    students = {}
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(".csv"):
+                student = student_name(os.path.splitext(name)[0], name)
+                with open(os.path.join(path, name), newline="", encoding="utf-8") as stream:
+                    numbered = enumerate(csv.DictReader(stream), 2)
+                    students[student] = _tasks(numbered)
+    else:
+        with open(path, newline="", encoding="utf-8") as stream:
+            reader = csv.DictReader(stream)
+            if "student" not in (reader.fieldnames or ()):
+                raise ValueError(f"{path}: a single CSV needs a student column")
+            rows = {}
+            for line, row in enumerate(reader, 2):
+                student = student_name(row["student"] or "", f"line {line}")
+                rows.setdefault(student, []).append((line, row))
+        for student, numbered in sorted(rows.items()):
+            students[student] = _tasks(numbered)
+    return sorted(students.items())
+
+
+def _tasks(numbered):
+    # Keeps a bad row from sinking the whole batch: the student is
+    # reported with the error instead of being planned.
+    try:
+        return [task_from_row(row, line) for line, row in numbered]
+    except ValueError as exc:
+        return exc
+
+
+def plan_student(job):
+    # Worker entry point: plans one student and writes their schedule.
+    student, tasks, options = job
+    summary = dict.fromkeys(SUMMARY_FIELDS, "")
+    summary["student"] = student
+    if isinstance(tasks, Exception):
+        summary["error"] = str(tasks)
+        return summary
+
+    windows = availability(options["start"], options["days"], options["hours"])
+    exhaustive = len(tasks) <= min(options["exhaustive"], EXHAUSTIVE_LIMIT)
+    result = plan(tasks, free_time(windows), options["rule"], exhaustive=exhaustive)
+    schedule = Schedule()
+    schedule.add_many(result.records())
+    with open(os.path.join(options["output"], f"{student}.csv"), "w",
+              newline="", encoding="utf-8") as stream:
+        write_csv(schedule, stream)
+    if options.get("charts"):
+        from chart_export import ChartCache
+
+        cache = ChartCache(options.get("chart_cache"), max_items=1)
+        with open(os.path.join(options["output"], f"{student}.{options['charts']}"), "wb") as stream:
+            stream.write(cache.render(schedule.rows(), options["charts"]))
+
+    summary.update(tasks=len(tasks), sessions=len(result.sessions),
+                   planned_minutes=sum(end - begin for begin, end, *_ in result.sessions),
+                   unplaced_minutes=sum(minutes for _, minutes in result.unplaced),
+                   late_tasks=len(result.late))
+    if len(schedule):
+        from analytics import SessionArrays, summarize
+
+        stats = summarize(SessionArrays.from_schedule(schedule))
+        summary.update(study_minutes=round(stats["study_minutes"]),
+                       break_ratio=round(stats["break_ratio"], 4),
+                       priority_compliance=round(stats["priority_compliance"], 4),
+                       busiest_hour=stats["busiest_hour"])
+    return summary
+
+
+def run(students, output, workers=None, **options):
+    # Returns the summaries in student order; workers=1 plans in-process.
+    os.makedirs(output, exist_ok=True)
+    options["output"] = output
+    jobs = [(student, tasks, options) for student, tasks in students]
+    if workers == 1 or len(jobs) < 2:
+        summaries = [plan_student(job) for job in jobs]
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as pool:
+            # Large chunks keep the per-job pickling overhead negligible.
+            chunk = max(1, len(jobs) // (workers * 4))
+            summaries = list(pool.map(plan_student, jobs, chunksize=chunk))
+
+    with open(os.path.join(output, f"{SUMMARY_NAME}.csv"), "w", newline="", encoding="utf-8") as stream:
+        writer = csv.DictWriter(stream, SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(summaries)
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan many students' schedules at once")
+    parser.add_argument("input", help="directory of per-student CSVs, or one CSV with a student column")
+    parser.add_argument("output", help="directory for per-student schedules and summary.csv")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(),
+                        help="first day to plan, YYYY-MM-DD (default: today)")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--hours", default=DEFAULT_HOURS, help="daily study hours")
+    parser.add_argument("--max-focus", type=int, default=90, help="minutes before a break")
+    parser.add_argument("--break-length", type=int, default=10)
+    parser.add_argument("--exhaustive", type=int, default=0, metavar="N",
+                        help="search every order for students with at most N tasks")
+    parser.add_argument("--charts", choices=("png", "svg", "pdf"),
+                        help="also render each student's charts in this format")
+    parser.add_argument("--chart-cache", metavar="DIR",
+                        help="reuse charts rendered by earlier runs for unchanged schedules")
+    args = parser.parse_args(argv)
+
+    started = datetime.now()
+    try:
+        students = read_students(args.input)
+    except ValueError as exc:
+        parser.error(str(exc))
+    summaries = run(students, args.output, args.workers, start=args.start, days=args.days,
+                    hours=parse_hours(args.hours),
+                    rule=BreakRule(args.max_focus, args.break_length),
+                    exhaustive=args.exhaustive, charts=args.charts,
+                    chart_cache=args.chart_cache)
+    failed = [summary for summary in summaries if summary["error"]]
+    print(f"Planned {len(summaries) - len(failed)} students in "
+          f"{(datetime.now() - started).total_seconds():.1f}s; {len(failed)} failed")
+    for summary in failed[:10]:
+        print(f"  {summary['student']}: {summary['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from metrics import percentile
+from schedule_core import CATEGORIES, PRIORITIES, Schedule
+from schedule_table import ScheduleTable
+from timers import TimerService
+
+# Reproducible benchmarks for the scheduler hot paths. Everything is seeded,
+# timers run on a simulated clock, and the Treeview is replaced by an
+# in-memory stand-in unless --tk is given (use a virtual display such as
+# xvfb-run on servers). Latencies are per operation; memory is the net
+# allocation per operation measured in a separate tracemalloc pass so the
+# tracing does not distort the timings.
+#
+#   python benchmarks.py --sizes 10 1000 100000 --timers 10000 --json out.json
+
+SUBJECTS = ("Mathematics", "Physics", "Chemistry", "Biology", "History", "Literature",
+            "Economics", "Computer Science")
+BASE = datetime(2025, 1, 6)
+
+
+class FakeTree:
+    # The subset of ttk.Treeview that ScheduleTable uses, backed by a list.
+    def __init__(self):
+        self._rows = []
+        self._values = {}
+
+    def get_children(self, item=""):
+        return tuple(self._rows)
+
+    def delete(self, *items):
+        doomed = set(items)
+        self._rows = [iid for iid in self._rows if iid not in doomed]
+        for iid in items:
+            del self._values[iid]
+
+    def insert(self, parent, index, iid, values):
+        if index == "end":
+            self._rows.append(iid)
+        else:
+            self._rows.insert(index, iid)
+        self._values[iid] = values
+        return iid
+
+    def exists(self, iid):
+        return iid in self._values
+
+    def item(self, iid, values=None):
+        if values is not None:
+            self._values[iid] = values
+        return {'values': self._values[iid]}
+
+    def move(self, iid, parent, index):
+        self._rows.remove(iid)
+        self._rows.insert(index, iid)
+
+    def see(self, iid):
+        pass
+
+
+def make_tree(use_tk):
+    if not use_tk:
+        return FakeTree(), None
+    import tkinter as tk
+    from tkinter import ttk
+
+    root = tk.Tk()
+    root.withdraw()
+    tree = ttk.Treeview(root, columns=('Time', 'Task', 'Duration', 'Priority'),
+                        show='headings')
+    return tree, root
+
+
+def records(count, seed, days=None):
+    # Synthetic sessions spread over `days` days (about six a day), with a
+    # realistic mix of subjects, priorities and breaks.
+    rng = random.Random(seed)
+    days = days or max(1, count // 6)
+    for _ in range(count):
+        start = BASE + timedelta(minutes=rng.randrange(days * 1440))
+        category = rng.choices(CATEGORIES, (8, 1, 1))[0]
+        task = rng.choice(SUBJECTS) if category == "Study" else category
+        yield (start, rng.choice((5, 25, 45, 60, 90)), task, rng.choice(PRIORITIES), category)
+
+
+def timings(operation, arguments):
+    # Nanoseconds per call of operation(argument) for each argument.
+    samples = []
+    clock = time.perf_counter_ns
+    for argument in arguments:
+        began = clock()
+        operation(argument)
+        samples.append(clock() - began)
+    return samples
+
+
+def net_bytes(operation, arguments):
+    # Net bytes still allocated per call once all calls have run.
+    arguments = list(arguments)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for argument in arguments:
+        operation(argument)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / max(len(arguments), 1), peak - before
+
+
+def stats(samples, memory=None):
+    ordered = sorted(samples)
+    result = {
+        'ops': len(ordered),
+        'p50_us': percentile(ordered, 0.50) / 1000,
+        'p90_us': percentile(ordered, 0.90) / 1000,
+        'p99_us': percentile(ordered, 0.99) / 1000,
+        'max_us': (ordered[-1] if ordered else 0) / 1000,
+    }
+    if memory is not None:
+        result['bytes_per_op'], result['peak_bytes'] = memory
+    return result
+
+
+def populated(size, seed, use_tk):
+    schedule = Schedule()
+    schedule.add_many(records(size, seed))
+    tree, root = make_tree(use_tk)
+    table = ScheduleTable(tree, schedule)
+    return schedule, table, root
+
+
+def bench_schedule(size, seed, ops, use_tk, charts):
+    results = {}
+    rng = random.Random(seed + 1)
+    batch = list(records(size, seed))
+
+    def build(kept):
+        schedule = Schedule()
+        schedule.add_many(batch)
+        kept.append(schedule)
+    repeats = max(1, min(20, 100000 // max(size, 1)))
+    results['build'] = stats(timings(lambda _: build([]), range(repeats)),
+                             net_bytes(build, [[]]))
+    results['build']['bytes_per_session'] = results['build'].pop('bytes_per_op') / max(size, 1)
+
+    # Single adds go through the table listener, as add_session does in
+    # the window; memory is measured on a second, identical schedule.
+    extra = list(records(ops, seed + 2, days=max(1, size // 6)))
+    schedule, table, root = populated(size, seed, use_tk)
+    results['add'] = stats(timings(lambda record: schedule.add(*record), extra))
+    twin, twin_table, twin_root = populated(size, seed, use_tk)
+    results['add'].update(zip(('bytes_per_op', 'peak_bytes'),
+                              net_bytes(lambda record: twin.add(*record), extra)))
+
+    moments = [BASE + timedelta(minutes=rng.randrange(max(1, size // 6) * 1440))
+               for _ in range(ops)]
+    results['conflicts'] = stats(timings(lambda moment: schedule.conflicts(moment, 60), moments))
+    results['find_gap'] = stats(timings(lambda moment: schedule.find_gap(45, moment), moments))
+
+    results['table_refresh'] = stats(timings(lambda _: table.refresh(), range(min(ops, 200))))
+    pages = [rng.randrange(len(schedule)) for _ in range(min(ops, 200))]
+    results['table_page'] = stats(timings(
+        lambda index: table.see(schedule.session_at(index).id), pages))
+
+    victims = rng.sample(schedule.ids(), min(ops, len(schedule)))
+    results['remove'] = stats(timings(schedule.remove, victims))
+
+    if charts:
+        results.update(bench_charts(schedule, min(ops, 20)))
+    analytics = bench_analytics(schedule, min(ops, 20))
+    if analytics:
+        results['analytics'] = analytics
+
+    for window in (root, twin_root):
+        if window is not None:
+            window.destroy()
+    return results
+
+
+def bench_charts(schedule, repeats):
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    except ImportError:
+        return {}
+    from chart_export import PALETTE
+    from charts import ScheduleCharts
+
+    fig = Figure(figsize=(8, 3))
+    canvas = FigureCanvasAgg(fig)
+    pie_ax, gantt_ax = fig.subplots(1, 2)
+    charts = ScheduleCharts(fig, pie_ax, gantt_ax, canvas, schedule, PALETTE)
+
+    def redraw(_):
+        charts.update()
+        canvas.draw()
+    return {'charts_update': stats(timings(lambda _: charts.update(), range(repeats))),
+            'charts_redraw': stats(timings(redraw, range(repeats)))}
+
+
+def bench_analytics(schedule, repeats):
+    try:
+        from analytics import SessionArrays, summarize
+    except ImportError:
+        return {}
+    return stats(timings(lambda _: summarize(SessionArrays.from_schedule(schedule)),
+                         range(repeats)))
+
+
+def bench_timers(count, seed):
+    # count concurrent timers on a simulated clock, expiring over an hour.
+    rng = random.Random(seed)
+    now = [0.0]
+    service = TimerService(clock=lambda: now[0])
+    durations = [rng.uniform(1, 3600) for _ in range(count)]
+
+    results = {'start': stats(timings(lambda seconds: service.start(seconds, "bench"),
+                                      durations))}
+    victims = rng.sample([timer.id for timer in service.timers()], count // 10)
+    results['cancel'] = stats(timings(service.cancel, victims))
+
+    # Advance the clock in one-second ticks, as a driver would wake up.
+    expired = []
+
+    def tick(second):
+        now[0] = second
+        expired.extend(service.poll())
+    results['poll'] = stats(timings(tick, range(1, 3602)))
+    results['poll']['expired'] = len(expired)
+    results['memory'] = dict(zip(('bytes_per_timer', 'peak_bytes'), net_bytes(
+        lambda seconds: service.start(seconds, "bench"), durations)))
+    return results
+
+
+def report(results):
+    lines = []
+    for group, benchmarks in results.items():
+        lines.append(group)
+        for name, values in benchmarks.items():
+            if 'p50_us' not in values:
+                lines.append(f"  {name:<16}" + "  ".join(f"{key}={value:,.0f}"
+                                                         for key, value in values.items()))
+                continue
+            line = (f"  {name:<16}{values['ops']:>7} ops  p50 {values['p50_us']:>10.1f}us"
+                    f"  p90 {values['p90_us']:>10.1f}us  p99 {values['p99_us']:>10.1f}us"
+                    f"  max {values['max_us']:>10.1f}us")
+            for key in ('bytes_per_session', 'bytes_per_op'):
+                if key in values:
+                    line += f"  {values[key]:>8.0f} B/{key.split('_')[-1]}"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000],
+                        help="schedule sizes to test")
+    parser.add_argument("--timers", type=int, default=10000, help="concurrent timers")
+    parser.add_argument("--ops", type=int, default=1000, help="operations timed per benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tk", action="store_true",
+                        help="use a real Treeview (needs a display, e.g. xvfb-run)")
+    parser.add_argument("--no-charts", dest="charts", action="store_false")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for size in args.sizes:
+        results[f"schedule[{size}]"] = bench_schedule(size, args.seed, args.ops, args.tk,
+                                                      args.charts)
+    if args.timers:
+        results[f"timers[{args.timers}]"] = bench_timers(args.timers, args.seed)
+
+    print(report(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as stream:
+            json.dump(results, stream, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import hashlib
+import io
+import os
+from collections import OrderedDict
+
+from schedule_core import Schedule, to_minutes
+
+# Off-screen rendering of the pie and Gantt charts for reports. Figures are
+# drawn with the Agg backend, never Tk, so this works in headless servers and
+# worker processes. matplotlib is imported on first render only. Rendered
+# files are cached under a hash of the schedule content and the render
+# settings, so an unchanged schedule is never drawn twice.
+
+FORMATS = ("png", "svg", "pdf")
+
+# The window's pastel palette; the GUI uses it too.
+PALETTE = {
+    'bg': '#fafafa',
+    'card': '#ffffff',
+    'primary': '#a8d8ea',      # Soft blue
+    'secondary': '#aa96da',    # Soft purple
+    'accent': '#ffd3b6',       # Soft peach
+    'success': '#c7ecee',      # Mint
+    'warning': '#ffaaa5',      # Soft coral
+    'text': '#2d3436',         # Dark gray
+    'border': '#dfe6e9'        # Light gray
+}
+
+
+def select_rows(rows, start=None, end=None):
+    # Rows overlapping [start, end) (datetimes; None leaves a side open).
+    low = None if start is None else to_minutes(start)
+    high = None if end is None else to_minutes(end)
+    for row in rows:
+        if high is not None and row[0] >= high:
+            break
+        if low is None or row[1] > low:
+            yield row
+
+
+def content_hash(rows, fmt="png", size=(8, 3), dpi=100):
+    digest = hashlib.blake2b(f"{fmt}|{size}|{dpi}|".encode(), digest_size=16)
+    for start, end, task, priority, category in rows:
+        digest.update(f"{start},{end},{task},{priority},{category}\n".encode())
+    return digest.hexdigest()
+
+
+def render_rows(rows, fmt="png", size=(8, 3), dpi=100):
+    # rows: start-ordered (start, end, task, priority, category) in minutes,
+    # as from Schedule.rows(). Returns the encoded image.
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported chart format {fmt!r}")
+    schedule = Schedule()
+    schedule.restore((sid, *row) for sid, row in enumerate(rows))
+
+    charts = _charts(size, dpi)
+    charts.schedule = schedule
+    charts.update()
+    buffer = io.BytesIO()
+    charts.fig.savefig(buffer, format=fmt, facecolor=charts.fig.get_facecolor())
+    return buffer.getvalue()
+
+
+_figures = {}
+
+
+def _charts(size, dpi):
+    # One figure per size is built per process and re-pointed at each
+    # schedule, as the window does; building and laying out a fresh figure
+    # costs more than drawing it. Not for use from several threads.
+    charts = _figures.get((size, dpi))
+    if charts is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from charts import ScheduleCharts
+
+        fig = Figure(figsize=size, dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        pie_ax, gantt_ax = fig.subplots(1, 2)
+        fig.patch.set_facecolor(PALETTE['card'])
+        for ax in (pie_ax, gantt_ax):
+            ax.set_facecolor(PALETTE['card'])
+        charts = _figures[(size, dpi)] = ScheduleCharts(fig, pie_ax, gantt_ax, canvas,
+                                                        Schedule(), PALETTE)
+    return charts
+
+
+class ChartCache:
+    # In-memory LRU of rendered images, optionally backed by a directory
+    # that outlives the process and is shared between workers.
+    def __init__(self, directory=None, max_items=32):
+        self.directory = directory
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def render(self, rows, fmt="png", size=(8, 3), dpi=100):
+        rows = list(rows)
+        key = content_hash(rows, fmt, size, dpi)
+        image = self._images.get(key)
+        if image is None and self.directory:
+            image = self._read(key, fmt)
+        if image is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            image = render_rows(rows, fmt, size, dpi)
+            if self.directory:
+                self._write(key, fmt, image)
+        self._images[key] = image
+        self._images.move_to_end(key)
+        while len(self._images) > self.max_items:
+            self._images.popitem(last=False)
+        return image
+
+    def _read(self, key, fmt):
+        try:
+            with open(os.path.join(self.directory, f"{key}.{fmt}"), "rb") as stream:
+                return stream.read()
+        except OSError:
+            return None
+
+    def _write(self, key, fmt, image):
+        # Written under a temporary name first so a concurrent reader never
+        # sees half a file.
+        path = os.path.join(self.directory, f"{key}.{fmt}")
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as stream:
+            stream.write(image)
+        os.replace(partial, path)
+
+
+_default_cache = ChartCache()
+
+
+def export_chart(schedule, path, start=None, end=None, cache=None, **options):
+    # Format follows the file extension (.png, .svg or .pdf).
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    rows = select_rows(schedule.rows(), start, end)
+    image = (cache or _default_cache).render(rows, fmt, **options)
+    with open(path, "wb") as stream:
+        stream.write(image)
+
+
+def _export_job(job):
+    rows, path, cache_dir, options = job
+    cache = ChartCache(cache_dir, max_items=1) if cache_dir else _default_cache
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    with open(path, "wb") as stream:
+        stream.write(cache.render(rows, fmt, **options))
+    return path
+
+
+def export_many(jobs, workers=None, cache_dir=None, **options):
+    # jobs: (rows, path) pairs, rows as from Schedule.rows(). Plain rows
+    # rather than Schedules are sent so each job pickles cheaply.
+    work = [(list(rows), path, cache_dir, options) for rows, path in jobs]
+    if workers == 1 or len(work) < 2:
+        return [_export_job(job) for job in work]
+    # Imported here: it costs the window more start-up time than the
+    # rest of this module.
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_export_job, work, chunksize=max(1, len(work) // (workers * 4))))
@@ -0,0 +1,153 @@
+import math
+
+import numpy as np
+from matplotlib.collections import PolyCollection
+
+from metrics import timed
+from schedule_core import CATEGORIES
+
+EMPTY_MESSAGE = 'Add study sessions\nto see analytics'
+MAX_ROW_LABELS = 40
+
+
+def day_segments(start, end):
+    # Splits a span in minutes into (row-local) hour ranges on a 24h axis;
+    # a block that runs past midnight wraps round to the start of the axis.
+    left = (start % 1440) / 60
+    hours = min(end - start, 1440) / 60
+    if left + hours <= 24:
+        return [(left, left + hours)]
+    return [(left, 24), (0, left + hours - 24)]
+
+
+class ScheduleCharts:
+    # Owns the pie and Gantt artists and updates them in place; redraws
+    # requested in quick succession are coalesced into one render.
+    def __init__(self, fig, pie_ax, gantt_ax, canvas, schedule, colors,
+                 after=None, delay_ms=50):
+        self.fig = fig
+        self.pie_ax = pie_ax
+        self.gantt_ax = gantt_ax
+        self.canvas = canvas
+        self.schedule = schedule
+        self.colors = colors
+        self.after = after
+        self.delay_ms = delay_ms
+        self._pending = None
+
+        self.pie_colors = [colors['primary'], colors['secondary'],
+                           colors['accent'], colors['success']]
+        self.task_colors = {
+            'Study': colors['primary'],
+            'Water Break': colors['success'],
+            'Food Break': colors['accent']
+        }
+
+        self._wedges = {}
+        self._setup_axes()
+        schedule.subscribe(lambda changes: self.request_redraw())
+
+    def _setup_axes(self):
+        text = self.colors['text']
+        self.pie_ax.set_title('Time Distribution', color=text)
+        self.pie_ax.set_aspect('equal')
+        self.pie_ax.set_xlim(-1.25, 1.25)
+        self.pie_ax.set_ylim(-1.25, 1.25)
+        self.pie_ax.axis('off')
+
+        self.gantt_ax.set_title('Daily Schedule', color=text)
+        self.gantt_ax.set_xlabel('Time of Day', color=text)
+        self.gantt_ax.set_xlim(0, 24)
+        self.gantt_ax.set_xticks(range(0, 25, 3))
+        self.gantt_ax.tick_params(colors=text)
+
+        self.bars = PolyCollection([], alpha=0.8)
+        self.gantt_ax.add_collection(self.bars)
+
+        self.empty_labels = [
+            ax.text(0.5, 0.5, EMPTY_MESSAGE, ha='center', va='center',
+                    transform=ax.transAxes, fontsize=10, color=text)
+            for ax in (self.pie_ax, self.gantt_ax)
+        ]
+        self.fig.tight_layout()
+
+    def request_redraw(self):
+        if self.after is None:
+            self.redraw()
+        elif self._pending is None:
+            self._pending = self.after(self.delay_ms, self.redraw)
+
+    @timed("charts.redraw")
+    def redraw(self):
+        self._pending = None
+        self.update()
+        self.canvas.draw_idle()
+
+    @timed("charts.update")
+    def update(self):
+        # Brings the artists up to date without drawing, for callers that
+        # render the figure themselves (e.g. savefig).
+        rows = list(self.schedule.rows())
+
+        for label in self.empty_labels:
+            label.set_visible(not rows)
+
+        self._update_pie(self.schedule.category_totals())
+        self._update_gantt(rows)
+
+    def _wedge(self, category):
+        artists = self._wedges.get(category)
+        if artists is None:
+            # Known categories keep the same colour whatever order they
+            # first appear in.
+            slot = CATEGORIES.index(category) if category in CATEGORIES else len(self._wedges)
+            color = self.pie_colors[slot % len(self.pie_colors)]
+            wedges, labels, pcts = self.pie_ax.pie(
+                [1], labels=[category], autopct='%1.0f%%', colors=[color],
+                textprops={'color': self.colors['text']})
+            artists = self._wedges[category] = (wedges[0], labels[0], pcts[0])
+        return artists
+
+    @timed("charts.pie")
+    def _update_pie(self, totals):
+        total = sum(totals.values())
+        angle = 90.0
+        for category in list(totals) + [c for c in self._wedges if c not in totals]:
+            wedge, label, pct = self._wedge(category)
+            share = totals.get(category, 0) / total if total else 0
+            visible = share > 0
+            for artist in (wedge, label, pct):
+                artist.set_visible(visible)
+            if not visible:
+                continue
+
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + 360 * share)
+            middle = math.radians(angle + 180 * share)
+            label.set_position((1.1 * math.cos(middle), 1.1 * math.sin(middle)))
+            label.set_horizontalalignment('left' if math.cos(middle) >= 0 else 'right')
+            pct.set_position((0.6 * math.cos(middle), 0.6 * math.sin(middle)))
+            pct.set_text(f"{share * 100:.0f}%")
+            angle += 360 * share
+
+    @timed("charts.gantt")
+    def _update_gantt(self, rows):
+        verts = []
+        colors = []
+        for i, (start, end, task, priority, category) in enumerate(rows):
+            color = self.task_colors.get(task, self.colors['secondary'])
+            for left, right in day_segments(start, end):
+                verts.append([(left, i - 0.4), (left, i + 0.4),
+                              (right, i + 0.4), (right, i - 0.4)])
+                colors.append(color)
+        # An (N, 4, 2) array takes matplotlib's vectorised path-building route
+        self.bars.set_verts(np.asarray(verts, dtype=float).reshape(-1, 4, 2))
+        self.bars.set_facecolor(colors)
+
+        ax = self.gantt_ax
+        ax.set_ylim(-0.5, max(len(rows), 1) - 0.5)
+        if len(rows) <= MAX_ROW_LABELS:
+            ax.set_yticks(range(len(rows)))
+            ax.set_yticklabels([row[2] for row in rows])
+        else:
+            ax.set_yticks([])
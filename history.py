@@ -0,0 +1,72 @@
+from collections import deque
+from contextlib import contextmanager
+
+# Multi-level undo/redo over a Schedule. Each step is the undo journal the
+# Schedule already keeps for transactions: one small tuple per inserted or
+# deleted row (a clear keeps the old columns by reference), so a step costs
+# memory in proportion to what it changed, never a copy of the schedule.
+# Undoing replays the journal backwards through the normal change path, so
+# the table, charts, progress bar and store update incrementally.
+
+DEFAULT_LIMIT = 500
+
+
+class History:
+    def __init__(self, schedule, limit=DEFAULT_LIMIT):
+        self.schedule = schedule
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+        self._paused = 0
+        self.listeners = []
+        schedule.record(self._record)
+
+    def _record(self, journal):
+        if self._paused:
+            return
+        self._undo.append(journal)
+        self._redo.clear()
+        self._changed()
+
+    @contextmanager
+    def paused(self):
+        # Changes made inside are not undoable steps, e.g. loading saved
+        # sessions or projecting recurring ones.
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        # Returns the step that was undone, or None if there was none.
+        if not self._undo:
+            return None
+        journal = self._undo.pop()
+        with self.paused():
+            self._redo.append(self.schedule.revert(journal))
+        self._changed()
+        return journal
+
+    def redo(self):
+        if not self._redo:
+            return None
+        journal = self._redo.pop()
+        with self.paused():
+            self._undo.append(self.schedule.revert(journal))
+        self._changed()
+        return journal
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._changed()
+
+    def _changed(self):
+        for listener in self.listeners:
+            listener(self)
@@ -0,0 +1,245 @@
+import random
+
+# Treap keyed on packed (start << 32 | id) values, augmented with the
+# largest end time in each subtree so overlap and gap queries can prune
+# whole branches. Each subtree also keeps its first and last start and an
+# upper bound on the free time between its own intervals, which lets
+# find_gap skip subtrees with no room, and its size, which answers
+# positional queries (rank, select, paging) in O(log n).
+_ID_MASK = 0xFFFFFFFF
+_NO_GAP = -(1 << 62)
+
+
+class _Node:
+    __slots__ = ('key', 'end', 'max_end', 'low', 'high', 'gap', 'size', 'prio', 'left',
+                 'right')
+
+    def __init__(self, key, end, prio):
+        self.key = key
+        self.end = end
+        self.max_end = end
+        self.low = self.high = key >> 32
+        self.gap = _NO_GAP
+        self.size = 1
+        self.prio = prio
+        self.left = None
+        self.right = None
+
+
+def _refresh(node):
+    # gap bounds each interval's start minus the latest end before it in
+    # the subtree. It is exact for the subtree's own order but ignores
+    # intervals outside it, hence only an upper bound once nested.
+    start = node.key >> 32
+    best = node.end
+    gap = _NO_GAP
+    low = high = start
+    size = 1
+    left = node.left
+    if left is not None:
+        size += left.size
+        low = left.low
+        gap = left.gap
+        if start - left.max_end > gap:
+            gap = start - left.max_end
+        if left.max_end > best:
+            best = left.max_end
+    right = node.right
+    if right is not None:
+        size += right.size
+        high = right.high
+        if right.gap > gap:
+            gap = right.gap
+        if right.low - best > gap:
+            gap = right.low - best
+        if right.max_end > best:
+            best = right.max_end
+    node.max_end = best
+    node.low = low
+    node.high = high
+    node.gap = gap
+    node.size = size
+
+
+def _split(node, key):
+    # Returns (keys < key, keys >= key).
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        _refresh(node)
+        return node, right
+    left, node.left = _split(node.left, key)
+    _refresh(node)
+    return left, node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.prio > right.prio:
+        left.right = _merge(left.right, right)
+        _refresh(left)
+        return left
+    right.left = _merge(left, right.left)
+    _refresh(right)
+    return right
+
+
+class IntervalIndex:
+    def __init__(self, seed=None):
+        self._root = None
+        self._random = random.Random(seed)
+
+    def __len__(self):
+        return 0 if self._root is None else self._root.size
+
+    def clear(self):
+        self._root = None
+
+    def insert(self, start, end, sid):
+        key = (start << 32) | sid
+        node = _Node(key, end, self._random.random())
+        # Descend to where the new priority belongs, then split only the
+        # subtree below that point.
+        path = []
+        current = self._root
+        while current is not None and current.prio > node.prio:
+            path.append(current)
+            current = current.left if key < current.key else current.right
+        node.left, node.right = _split(current, key)
+        _refresh(node)
+
+        if not path:
+            self._root = node
+        elif key < path[-1].key:
+            path[-1].left = node
+        else:
+            path[-1].right = node
+        for parent in reversed(path):
+            _refresh(parent)
+
+    def remove(self, start, sid):
+        key = (start << 32) | sid
+        path = []
+        current = self._root
+        while current is not None and current.key != key:
+            path.append(current)
+            current = current.left if key < current.key else current.right
+        if current is None:
+            raise KeyError(sid)
+
+        replacement = _merge(current.left, current.right)
+        if not path:
+            self._root = replacement
+        elif path[-1].left is current:
+            path[-1].left = replacement
+        else:
+            path[-1].right = replacement
+        for node in reversed(path):
+            _refresh(node)
+
+    def max_end(self):
+        return None if self._root is None else self._root.max_end
+
+    def rank(self, start, sid=0):
+        # Number of intervals ordered before (start, sid); with the default
+        # sid, the number starting before `start`.
+        key = (start << 32) | sid
+        count = 0
+        node = self._root
+        while node is not None:
+            if node.key < key:
+                count += 1 if node.left is None else node.left.size + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def select(self, index):
+        # Id of the interval at position `index` in (start, id) order.
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError(index)
+        node = self._root
+        while True:
+            before = 0 if node.left is None else node.left.size
+            if index < before:
+                node = node.left
+            elif index == before:
+                return node.key & _ID_MASK
+            else:
+                index -= before + 1
+                node = node.right
+
+    def ids(self, offset=0):
+        # Ids in (start, id) order from position `offset`, lazily; the
+        # index must not change while this is being consumed.
+        stack = []
+        node = self._root
+        while node is not None:
+            before = 0 if node.left is None else node.left.size
+            if offset < before:
+                stack.append(node)
+                node = node.left
+            elif offset == before:
+                stack.append(node)
+                break
+            else:
+                offset -= before + 1
+                node = node.right
+        while stack:
+            node = stack.pop()
+            yield node.key & _ID_MASK
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def overlapping(self, start, end):
+        # Ids of intervals intersecting [start, end), in start order.
+        found = []
+        limit = end << 32
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.key >= limit:
+                break
+            if node.end > start:
+                found.append(node.key & _ID_MASK)
+            node = node.right
+        return found
+
+    def find_gap(self, after, length):
+        # Earliest moment >= after with `length` free minutes: the first
+        # interval whose start is `length` clear of both `after` and every
+        # end before it, in a single descent. Subtrees whose gap bound,
+        # first start or last start rules them out are passed over whole,
+        # so the cost does not grow with the number of gaps too short.
+        found, covered = self._first_fit(self._root, after, length)
+        return covered if found is None else found
+
+    def _first_fit(self, node, covered, length):
+        # Returns (moment or None, latest end so far, floored at after).
+        if node is None:
+            return None, covered
+        if node.low - covered < length and (node.gap < length or node.high - covered < length):
+            return None, node.max_end if node.max_end > covered else covered
+        found, covered = self._first_fit(node.left, covered, length)
+        if found is not None:
+            return found, covered
+        if (node.key >> 32) - covered >= length:
+            return covered, covered
+        if node.end > covered:
+            covered = node.end
+        return self._first_fit(node.right, covered, length)
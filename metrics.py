@@ -0,0 +1,95 @@
+import functools
+import math
+import os
+import time
+from collections import deque
+
+# Opt-in timing of the refresh and redraw stages for live diagnosis. While
+# disabled (the default) a decorated call costs one flag check; enable with
+# PASTEL_METRICS=1, `scheduler.py --metrics`, or metrics.registry.enable().
+
+MAX_SAMPLES = 10000     # most recent samples kept per metric
+
+
+def percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted sequence.
+    if not ordered:
+        return 0.0
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False, max_samples=MAX_SAMPLES):
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._samples = {}
+        self._counts = {}
+        self._totals = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self._samples.clear()
+        self._counts.clear()
+        self._totals.clear()
+
+    def record(self, name, seconds):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.max_samples)
+            self._counts[name] = 0
+            self._totals[name] = 0.0
+        samples.append(seconds)
+        self._counts[name] += 1
+        self._totals[name] += seconds
+
+    def timed(self, name):
+        # Decorator recording each call's wall time under `name`.
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                began = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - began)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        # {name: {count, total, mean, p50, p90, p99, max}} in seconds; the
+        # percentiles cover the most recent max_samples calls.
+        stats = {}
+        for name, samples in self._samples.items():
+            ordered = sorted(samples)
+            count = self._counts[name]
+            stats[name] = {
+                'count': count,
+                'total': self._totals[name],
+                'mean': self._totals[name] / count,
+                'p50': percentile(ordered, 0.50),
+                'p90': percentile(ordered, 0.90),
+                'p99': percentile(ordered, 0.99),
+                'max': ordered[-1],
+            }
+        return stats
+
+    def report(self):
+        lines = [f"{'metric':<24}{'count':>8}{'total ms':>11}{'p50 ms':>9}"
+                 f"{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+        for name, stats in sorted(self.snapshot().items()):
+            lines.append(f"{name:<24}{stats['count']:>8}{stats['total'] * 1000:>11.1f}"
+                         + "".join(f"{stats[key] * 1000:>9.3f}"
+                                   for key in ('p50', 'p90', 'p99', 'max')))
+        return "\n".join(lines)
+
+
+registry = MetricsRegistry(enabled=os.environ.get("PASTEL_METRICS") == "1")
+timed = registry.timed
@@ -0,0 +1,227 @@
+import csv
+import itertools
+from datetime import datetime, timedelta
+
+from schedule_core import PRIORITIES, from_minutes, parse_duration, to_minutes
+
+# Automatic placement of a pool of tasks into free time. Tasks are split
+# into focus blocks no longer than the break rule allows and packed in
+# earliest-deadline-first order, priority breaking ties; with splitting
+# allowed that order meets every deadline that any order could. Small
+# pools can instead be searched exhaustively for the order that also
+# minimises priority-weighted completion times.
+
+EXHAUSTIVE_LIMIT = 7
+DEFAULT_HOURS = "09:00-12:00, 13:00-18:00, 19:00-21:00"
+_WEIGHTS = {"High": 3, "Medium": 2, "Low": 1}
+_NO_DEADLINE = float('inf')
+
+
+class PlanTask:
+    __slots__ = ('task', 'duration', 'priority', 'deadline', 'category')
+
+    def __init__(self, task, duration, priority="Medium", deadline=None, category="Study"):
+        self.task = task
+        self.duration = duration
+        self.priority = priority
+        self.deadline = deadline    # datetime the task should be done by
+        self.category = category
+
+    def __repr__(self):
+        return f"PlanTask({self.task!r}, {self.duration}, {self.priority!r})"
+
+
+class BreakRule:
+    # After max_focus minutes of work without a pause of at least `length`
+    # minutes, a break session is inserted.
+    def __init__(self, max_focus=90, length=10, task="Water Break", category="Water Break"):
+        if max_focus <= 0 or length <= 0:
+            raise ValueError("break rule needs positive focus and break lengths")
+        self.max_focus = max_focus
+        self.length = length
+        self.task = task
+        self.category = category
+
+
+class Plan:
+    def __init__(self):
+        self.sessions = []      # (begin, end, task, priority, category), minutes
+        self.unplaced = []      # (task, minutes that did not fit)
+        self.late = []          # (task, minutes past the deadline)
+        self.cost = (0, 0, 0)
+
+    def records(self):
+        # Schedule.add_many() input.
+        return [(from_minutes(begin), end - begin, task, priority, category)
+                for begin, end, task, priority, category in self.sessions]
+
+
+def parse_hours(text):
+    # "09:00-12:00, 13:30-18:00" -> [(540, 720), (810, 1080)] minutes of day.
+    hours = []
+    for part in text.split(","):
+        first, _, last = part.strip().partition("-")
+        begin = datetime.strptime(first.strip(), "%H:%M")
+        end = datetime.strptime(last.strip(), "%H:%M")
+        begin = begin.hour * 60 + begin.minute
+        end = end.hour * 60 + end.minute
+        if end <= begin:
+            end += 1440
+        hours.append((begin, end))
+    return hours
+
+
+def availability(first_day, days, hours=((9 * 60, 21 * 60),), weekdays=0b1111111):
+    # Study windows as (begin, end) minutes for `days` days from first_day;
+    # weekdays is a Monday-first bitmask as in recurrence.parse_weekdays.
+    base = to_minutes(datetime.combine(first_day, datetime.min.time()))
+    windows = []
+    for offset in range(days):
+        if not weekdays >> (first_day + timedelta(days=offset)).weekday() & 1:
+            continue
+        day = base + offset * 1440
+        windows.extend((day + begin, day + end) for begin, end in hours)
+    return windows
+
+
+def free_time(windows, schedule=None, after=None):
+    # Windows minus the sessions already in the schedule, clipped to start
+    # no earlier than `after`, as sorted, disjoint (begin, end) minutes.
+    low = to_minutes(after) if after is not None else None
+    free = []
+    for begin, end in sorted(windows):
+        if low is not None:
+            begin = max(begin, low)
+        if free and begin < free[-1][1]:
+            begin = free[-1][1]
+        if end <= begin:
+            continue
+        if schedule is not None:
+            for session in schedule.conflicts(from_minutes(begin), end - begin):
+                busy_begin, busy_end = to_minutes(session.start), to_minutes(session.end)
+                if busy_begin > begin:
+                    free.append((begin, busy_begin))
+                begin = max(begin, busy_end)
+        if end > begin:
+            free.append((begin, end))
+    return free
+
+
+def _rank(task):
+    return PRIORITIES.index(task.priority) if task.priority in PRIORITIES else len(PRIORITIES)
+
+
+def _deadline(task):
+    return _NO_DEADLINE if task.deadline is None else to_minutes(task.deadline)
+
+
+def _pack(order, free, rule, min_chunk):
+    result = Plan()
+    index = 0
+    moment = free[0][0] if free else 0
+    focus = 0
+    last_end = None
+    unplaced = late = completion = 0
+
+    for task in order:
+        left = task.duration
+        weight = _WEIGHTS.get(task.priority, 1)
+        while left and index < len(free):
+            if moment >= free[index][1]:
+                index += 1
+                if index < len(free):
+                    moment = free[index][0]
+                continue
+            if last_end is not None and moment - last_end >= rule.length:
+                focus = 0
+            space = free[index][1] - moment
+            # A focus limit shorter than min_chunk caps the block size too,
+            # or no block would ever fit between breaks.
+            smallest = min(left, min_chunk, rule.max_focus)
+            if rule.max_focus - focus < smallest:
+                # Rest first, or skip to the next window if the break and
+                # a block after it do not fit in this one (the gap counts
+                # as rest).
+                if space >= rule.length + smallest:
+                    result.sessions.append((moment, moment + rule.length, rule.task,
+                                          "High", rule.category))
+                    moment += rule.length
+                    last_end = moment
+                    focus = 0
+                else:
+                    moment = free[index][1]
+                continue
+            size = min(left, space, rule.max_focus - focus)
+            if size < smallest:
+                moment = free[index][1]
+                continue
+            result.sessions.append((moment, moment + size, task.task, task.priority,
+                                  task.category))
+            moment += size
+            last_end = moment
+            focus += size
+            left -= size
+
+        if left:
+            result.unplaced.append((task.task, left))
+            unplaced += left * weight
+        elif last_end is not None:
+            overdue = last_end - _deadline(task)
+            if overdue > 0:
+                result.late.append((task.task, overdue))
+                late += overdue * weight
+            completion += last_end * weight
+    result.cost = (unplaced, late, completion)
+    return result
+
+
+def plan(tasks, free, rule=None, min_chunk=25, exhaustive=False):
+    # Packs tasks into the free (begin, end) minute intervals. The cost
+    # compared between orders is (unplaced, late, completion) minutes,
+    # each weighted by priority.
+    rule = rule or BreakRule()
+    tasks = list(tasks)
+    if not exhaustive:
+        order = sorted(tasks, key=lambda task: (_deadline(task), _rank(task), -task.duration))
+        return _pack(order, free, rule, min_chunk)
+
+    if len(tasks) > EXHAUSTIVE_LIMIT:
+        raise ValueError(f"exhaustive planning is limited to {EXHAUSTIVE_LIMIT} tasks")
+    best = None
+    for order in itertools.permutations(tasks):
+        candidate = _pack(order, free, rule, min_chunk)
+        if best is None or candidate.cost < best.cost:
+            best = candidate
+    return best or Plan()
+
+
+def plan_into(schedule, tasks, windows, rule=None, after=None, **options):
+    # Plans around the sessions already in the schedule and adds the result
+    # as one transaction. Returns the Plan and the new session ids.
+    result = plan(tasks, free_time(windows, schedule, after), rule, **options)
+    return result, schedule.add_many(result.records())
+
+
+def read_tasks(stream):
+    # CSV with task and duration columns, plus optional priority, category
+    # and deadline ("YYYY-MM-DD" or "YYYY-MM-DD HH:MM"; a bare date means
+    # the end of that day).
+    return [task_from_row(row, line) for line, row in enumerate(csv.DictReader(stream), 2)]
+
+
+def task_from_row(row, line=None):
+    task = (row.get("task") or "").strip()
+    try:
+        if not task:
+            raise ValueError("missing task")
+        duration = parse_duration(row.get("duration", ""))
+        deadline = (row.get("deadline") or "").strip()
+        if len(deadline) == 10:
+            deadline = datetime.strptime(deadline, "%Y-%m-%d") + timedelta(days=1)
+        elif deadline:
+            deadline = datetime.strptime(deadline, "%Y-%m-%d %H:%M")
+    except ValueError as exc:
+        raise ValueError(f"line {line}: {exc}" if line else str(exc)) from None
+    priority = (row.get("priority") or "").strip().capitalize()
+    return PlanTask(task, duration, priority if priority in PRIORITIES else "Medium",
+                    deadline or None, (row.get("category") or "").strip() or "Study")
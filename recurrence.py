@@ -0,0 +1,163 @@
+import heapq
+import itertools
+from datetime import date, timedelta
+
+from schedule_core import EPOCH, from_minutes, to_minutes
+
+# Recurring session templates ("Organic Chemistry, 90 min, Mon/Wed/Fri at
+# 09:00 until December"). A rule is stored once; occurrences are generated
+# on demand for a window of time, and only that window is ever projected
+# into the Schedule.
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# Day 0 of the schedule epoch (1970-01-01) was a Thursday.
+_EPOCH_WEEKDAY = 3
+
+
+def _day_number(day):
+    return (day - EPOCH.date()).days
+
+
+def parse_weekdays(text):
+    # "Mon Wed Fri" / "mon,wed,fri" -> bitmask with Monday as bit 0.
+    mask = 0
+    for token in text.replace(",", " ").split():
+        name = token.strip()[:3].capitalize()
+        if name not in WEEKDAY_NAMES:
+            raise ValueError(f"unknown weekday {token!r}")
+        mask |= 1 << WEEKDAY_NAMES.index(name)
+    if not mask:
+        raise ValueError("no weekdays given")
+    return mask
+
+
+class RecurrenceRule:
+    __slots__ = ('id', 'task', 'duration', 'priority', 'category', 'weekdays',
+                 'at', 'first', 'until', 'exceptions', 'overrides')
+
+    def __init__(self, task, duration, weekdays, at, first, until=None,
+                 priority="Medium", category="Study", rid=None):
+        self.id = rid
+        self.task = task
+        self.duration = duration
+        self.priority = priority
+        self.category = category
+        self.weekdays = weekdays
+        self.at = at                # minutes after midnight
+        self.first = first
+        self.until = until          # inclusive; None repeats forever
+        self.exceptions = set()
+        self.overrides = {}
+
+    def skip(self, day):
+        self.exceptions.add(day)
+
+    def override(self, day, **changes):
+        # Per-occurrence changes: at, duration, task, priority or category.
+        unknown = set(changes) - {'at', 'duration', 'task', 'priority', 'category'}
+        if unknown:
+            raise ValueError(f"cannot override {', '.join(sorted(unknown))}")
+        self.overrides.setdefault(day, {}).update(changes)
+
+    def occurrences(self, start, end):
+        # (begin, end, task, priority, category) rows, times in minutes, for
+        # occurrences overlapping [start, end) minutes, in start order.
+        longest = max([self.duration] + [o.get('duration', 0) for o in self.overrides.values()])
+        low = max(start // 1440 - 1 - longest // 1440, _day_number(self.first))
+        high = (end - 1) // 1440
+        if self.until is not None:
+            high = min(high, _day_number(self.until))
+
+        for number in range(low, high + 1):
+            if not self.weekdays >> ((number + _EPOCH_WEEKDAY) % 7) & 1:
+                continue
+            day = EPOCH.date() + timedelta(days=number)
+            if day in self.exceptions:
+                continue
+            changes = self.overrides.get(day, {})
+            begin = number * 1440 + changes.get('at', self.at)
+            finish = begin + changes.get('duration', self.duration)
+            if finish > start and begin < end:
+                yield (begin, finish, changes.get('task', self.task),
+                       changes.get('priority', self.priority),
+                       changes.get('category', self.category))
+
+    def to_dict(self):
+        return {
+            'task': self.task, 'duration': self.duration, 'priority': self.priority,
+            'category': self.category, 'weekdays': self.weekdays, 'at': self.at,
+            'first': self.first.isoformat(),
+            'until': self.until.isoformat() if self.until else None,
+            'exceptions': sorted(day.isoformat() for day in self.exceptions),
+            'overrides': {day.isoformat(): changes for day, changes in self.overrides.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data, rid=None):
+        rule = cls(data['task'], data['duration'], data['weekdays'], data['at'],
+                   date.fromisoformat(data['first']),
+                   date.fromisoformat(data['until']) if data.get('until') else None,
+                   data.get('priority', "Medium"), data.get('category', "Study"), rid)
+        rule.exceptions = {date.fromisoformat(day) for day in data.get('exceptions', ())}
+        rule.overrides = {date.fromisoformat(day): changes
+                          for day, changes in data.get('overrides', {}).items()}
+        return rule
+
+
+def _tagged(rid, rows):
+    for begin, *rest in rows:
+        yield (begin, rid, *rest)
+
+
+class RecurrenceSet:
+    def __init__(self):
+        self.rules = {}
+        self._ids = itertools.count()
+        self._window = None
+
+    def add(self, rule):
+        if rule.id is None:
+            rule.id = next(self._ids)
+        else:
+            self._ids = itertools.count(max(rule.id + 1, next(self._ids)))
+        self.rules[rule.id] = rule
+        return rule.id
+
+    def remove(self, rid):
+        return self.rules.pop(rid)
+
+    def expand(self, start, end):
+        # Lazily merges every rule's occurrences in [start, end) by start
+        # time; yields (rule id, begin, end, task, priority, category).
+        streams = [_tagged(rid, rule.occurrences(start, end))
+                   for rid, rule in self.rules.items()]
+        for begin, rid, *rest in heapq.merge(*streams):
+            yield (rid, begin, *rest)
+
+    def project(self, schedule, start, end):
+        # Replaces the occurrences held in the schedule with those of the
+        # window [start, end) (datetimes), in one transaction. Whatever
+        # occurrences the schedule holds are replaced, including ones that
+        # an undo brought back; their ids are handed to the new ones so
+        # repeated projections do not keep growing the columns.
+        self._window = (start, end)
+        low, high = to_minutes(start), to_minutes(end)
+        with schedule.transaction():
+            freed = schedule.projected()
+            for sid in freed:
+                schedule.remove(sid)
+            freed = iter(freed)
+            for rid, begin, finish, task, priority, category in self.expand(low, high):
+                schedule.add(from_minutes(begin), finish - begin, task, priority,
+                             category, sid=next(freed, None), rule=rid)
+
+    def reproject(self, schedule):
+        if self._window is not None:
+            self.project(schedule, *self._window)
+
+    def occurrence_day(self, schedule, sid):
+        # The (rule, date) a projected session came from, for skip/override.
+        rule = schedule.rule_of(sid)
+        if rule is None:
+            return None, None
+        return self.rules[rule], schedule.get(sid).start.date()
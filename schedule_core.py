@@ -0,0 +1,521 @@
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+
+from interval_index import IntervalIndex
+from metrics import timed
+
+# Times are stored as whole minutes since this epoch (naive local time),
+# so blocks that run past midnight need no special casing.
+EPOCH = datetime(1970, 1, 1)
+
+# Starts are kept to signed 32-bit minutes (up to the year 6053) as a
+# sanity bound, so a mistyped year is rejected rather than stored.
+MIN_MINUTE = -(1 << 31)
+MAX_MINUTE = (1 << 31) - 1
+# Longest single session; running totals are split per day, so the cost of
+# an insert grows with the number of days a session spans.
+MAX_DURATION = 28 * 1440
+# Interval keys pack the session id into their low 32 bits.
+MAX_ID = (1 << 32) - 1
+
+PRIORITIES = ("High", "Medium", "Low")
+CATEGORIES = ("Study", "Water Break", "Food Break")
+
+
+def to_minutes(moment):
+    return int((moment - EPOCH).total_seconds() // 60)
+
+
+def from_minutes(minutes):
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def _bump(totals, key, minutes):
+    value = totals.get(key, 0) + minutes
+    if value:
+        totals[key] = value
+    else:
+        del totals[key]
+
+
+def _check_span(begin, end):
+    if not MIN_MINUTE <= begin <= MAX_MINUTE:
+        raise ValueError(f"start is out of range ({begin} minutes from {EPOCH:%Y-%m-%d})")
+    if end <= begin:
+        raise ValueError("duration must be a positive number of minutes")
+    if end - begin > MAX_DURATION:
+        raise ValueError(f"duration must be at most {MAX_DURATION} minutes")
+    if end > MAX_MINUTE:
+        raise ValueError("session ends out of range")
+
+
+def parse_duration(value):
+    duration = int(str(value).strip())
+    if duration <= 0:
+        raise ValueError("duration must be a positive number of minutes")
+    if duration > MAX_DURATION:
+        raise ValueError(f"duration must be at most {MAX_DURATION} minutes")
+    return duration
+
+
+def parse_clock_time(value, after):
+    # "HH:MM" resolved to its next occurrence at or after `after`, so an
+    # evening plan can name times past midnight.
+    clock = datetime.strptime(str(value).strip(), "%H:%M")
+    after = after.replace(second=0, microsecond=0)
+    moment = after.replace(hour=clock.hour, minute=clock.minute)
+    if moment < after:
+        moment += timedelta(days=1)
+    return moment
+
+
+class Session:
+    __slots__ = ('id', 'start', 'end', 'task', 'duration', 'priority', 'category', 'rule')
+
+    def __init__(self, sid, start, end, task, priority, category, rule=None):
+        self.id = sid
+        self.start = start
+        self.end = end
+        self.task = task
+        self.duration = int((end - start).total_seconds() // 60)
+        self.priority = priority
+        self.category = category
+        self.rule = rule
+
+    def __repr__(self):
+        return (f"Session(id={self.id}, start={self.start:%Y-%m-%d %H:%M}, "
+                f"duration={self.duration}, task={self.task!r})")
+
+
+class StringTable:
+    # Interns repeated labels (task names, priorities, categories) so each
+    # session only carries a small integer code.
+    def __init__(self, initial=()):
+        self.values = []
+        self.codes = {}
+        for value in initial:
+            self.code(value)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+
+class DailyGoals:
+    # Target minutes per day: a default plus optional per-date overrides.
+    def __init__(self, default=6 * 60):
+        self.default = default
+        self.overrides = {}
+
+    def set(self, day, minutes):
+        if minutes is None:
+            self.overrides.pop(day, None)
+        else:
+            self.overrides[day] = minutes
+
+    def for_day(self, day):
+        return self.overrides.get(day, self.default)
+
+
+class Schedule:
+    def __init__(self):
+        self.tasks = StringTable()
+        self.priorities = StringTable(PRIORITIES)
+        self.categories = StringTable(CATEGORIES)
+        self._listeners = []
+        self._recorders = []
+        # While a transaction is open: pending change notifications, and an
+        # undo journal used to roll the columns back if it fails.
+        self._pending = None
+        self._journal = None
+        self.goals = DailyGoals()
+        self._reset()
+
+    def _reset(self):
+        # Parallel columns indexed by session id; removed rows are tombstoned
+        # so ids stay stable for views that key rows on them.
+        self._start = array('q')
+        self._end = array('q')
+        self._task = array('I')
+        self._priority = array('B')
+        self._category = array('B')
+        # Recurrence rule id for occurrences projected from a template, or
+        # -1 for ordinary sessions.
+        self._rule = array('i')
+        # Ids of the live ones among those, so replacing them never scans
+        # the columns.
+        self._projected = set()
+        self._alive = bytearray()
+        self._count = 0
+        self._next_id = 0
+        # Live sessions by (start, id); also serves every positional query.
+        self._intervals = IntervalIndex()
+        # Running minute totals keyed by category code, priority code and
+        # (day number, category code); kept in step on every insert/delete.
+        self._totals = ({}, {}, {})
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, sid):
+        return 0 <= sid < len(self._alive) and self._alive[sid] == 1
+
+    def subscribe(self, listener):
+        # Listeners receive a list of (op, sid) changes, op being
+        # 'add', 'remove', 'update' or 'clear' (sid is None for 'clear').
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def record(self, recorder):
+        # Recorders receive the undo journal of every committed change, i.e.
+        # one entry per insert/delete holding just that row; see revert().
+        self._recorders.append(recorder)
+
+    def _changed(self, changes, journal):
+        self._notify(changes)
+        if self._pending is None:
+            for recorder in self._recorders:
+                recorder(journal)
+
+    @timed("schedule.notify")
+    def _notify(self, changes):
+        if self._pending is not None:
+            self._pending.extend(changes)
+            return
+        for listener in list(self._listeners):
+            listener(changes)
+
+    @contextmanager
+    def transaction(self):
+        # Changes made inside the block are all-or-nothing, and listeners
+        # hear about them once, as a single change list, on success.
+        if self._pending is not None:
+            yield self
+            return
+
+        self._pending = []
+        self._journal = []
+        try:
+            yield self
+        except BaseException:
+            journal = self._journal
+            self._pending = self._journal = None
+            self._rollback(journal)
+            raise
+
+        changes = self._net(self._pending)
+        journal = self._journal
+        self._pending = self._journal = None
+        if changes:
+            self._notify(changes)
+        if journal:
+            for recorder in self._recorders:
+                recorder(journal)
+
+    def _rollback(self, journal):
+        for op, data in reversed(journal):
+            if op == 'add':
+                self._delete(data)
+            elif op == 'remove':
+                self._insert(*data)
+            elif op == 'clear':
+                self._set_columns(data)
+
+    def _net(self, changes):
+        # Reduces a transaction's change list to one net change per session,
+        # so listeners never see a row that no longer exists or one removed
+        # and re-added within the same list. A clear drops what came before.
+        cleared = False
+        existed = {}
+        for op, sid in changes:
+            if op == 'clear':
+                cleared = True
+                existed.clear()
+            else:
+                existed.setdefault(sid, op != 'add')
+        net = [('clear', None)] if cleared else []
+        for sid, before in existed.items():
+            if sid in self:
+                net.append(('update' if before else 'add', sid))
+            elif before:
+                net.append(('remove', sid))
+        return net
+
+    def revert(self, journal):
+        # Undoes a committed journal as a new change, returning the journal
+        # that redoes it. Each step costs what the original insert or delete
+        # did; only undoing a clear touches every session.
+        with self.transaction():
+            mark = len(self._journal)
+            for op, data in reversed(journal):
+                if op == 'add':
+                    self._delete(data)
+                    self._notify([('remove', data)])
+                elif op == 'remove':
+                    self._insert(*data)
+                    self._notify([('add', data[5])])
+                elif op == 'clear':
+                    self._journal.append(('clear', self._columns()))
+                    self._set_columns(data)
+                    self._notify([('clear', None)] + [('add', sid) for sid in self.ids()])
+            inverse = self._journal[mark:]
+        return inverse
+
+    def _columns(self):
+        return (self._start, self._end, self._task, self._priority, self._category,
+                self._rule, self._projected, self._alive, self._count, self._next_id,
+                self._intervals, self._totals)
+
+    def _set_columns(self, columns):
+        (self._start, self._end, self._task, self._priority, self._category,
+         self._rule, self._projected, self._alive, self._count, self._next_id,
+         self._intervals, self._totals) = columns
+
+    def add(self, start, duration, task, priority="Medium", category="Study", sid=None,
+            rule=None):
+        begin = to_minutes(start)
+        _check_span(begin, begin + duration)
+        sid = self._insert(begin, begin + duration, self.tasks.code(task),
+                           self.priorities.code(priority),
+                           self.categories.code(category), sid,
+                           -1 if rule is None else rule)
+        self._changed([('add', sid)], [('add', sid)])
+        return sid
+
+    def update(self, sid, start=None, duration=None, task=None, priority=None, category=None):
+        # Edits a session in place, keeping its id; moving it is an update
+        # of start alone. Unchanged fields keep their values.
+        if sid not in self:
+            raise KeyError(sid)
+        begin = self._start[sid] if start is None else to_minutes(start)
+        if duration is None:
+            duration = self._end[sid] - self._start[sid]
+        _check_span(begin, begin + duration)
+        codes = (self._task[sid] if task is None else self.tasks.code(task),
+                 self._priority[sid] if priority is None else self.priorities.code(priority),
+                 self._category[sid] if category is None else self.categories.code(category))
+        with self.transaction():
+            rule = self._delete(sid)[6]
+            self._insert(begin, begin + duration, *codes, sid, rule)
+            self._notify([('update', sid)])
+        return self.get(sid)
+
+    def move(self, sid, start):
+        return self.update(sid, start=start)
+
+    def add_many(self, records):
+        # Atomically inserts (start, duration, task, priority, category)
+        # records; a start of None appends after the last session.
+        sids = []
+        with self.transaction():
+            for start, duration, task, priority, category in records:
+                if start is None:
+                    start = self.next_start()
+                sids.append(self.add(start, duration, task, priority, category))
+        return sids
+
+    def restore(self, rows):
+        # Bulk insert of (sid, start, end, task, priority, category) rows with
+        # times in minutes, e.g. from storage; listeners see one change list.
+        changes = []
+        with self.transaction():
+            for sid, begin, end, task, priority, category in rows:
+                sid = self._insert(begin, end, self.tasks.code(task),
+                                   self.priorities.code(priority),
+                                   self.categories.code(category), sid)
+                changes.append(('add', sid))
+            self._notify(changes)
+        return len(changes)
+
+    def reserve(self, next_id):
+        # Keeps new ids clear of ones that are still to be restored.
+        self._next_id = max(self._next_id, next_id)
+
+    def _insert(self, begin, end, task, priority, category, sid, rule=-1):
+        # Validated before anything is written, so a bad row leaves no trace.
+        _check_span(begin, end)
+        if priority > 255 or category > 255:
+            raise ValueError("too many distinct priorities or categories (at most 256)")
+        if sid is None:
+            sid = self._next_id
+        elif sid in self:
+            raise KeyError(f"session {sid} already exists")
+        if not 0 <= sid <= MAX_ID:
+            raise ValueError(f"session id {sid} is out of range")
+        self._next_id = max(self._next_id, sid + 1)
+
+        while len(self._alive) <= sid:
+            self._start.append(0)
+            self._end.append(0)
+            self._task.append(0)
+            self._priority.append(0)
+            self._category.append(0)
+            self._rule.append(-1)
+            self._alive.append(0)
+
+        self._start[sid] = begin
+        self._end[sid] = end
+        self._task[sid] = task
+        self._priority[sid] = priority
+        self._category[sid] = category
+        self._rule[sid] = rule
+        if rule >= 0:
+            self._projected.add(sid)
+        self._alive[sid] = 1
+        self._count += 1
+
+        self._intervals.insert(begin, end, sid)
+        self._tally(begin, end, priority, category, 1)
+        if self._journal is not None:
+            self._journal.append(('add', sid))
+        return sid
+
+    def _tally(self, begin, end, priority, category, sign):
+        by_category, by_priority, by_day = self._totals
+        _bump(by_category, category, sign * (end - begin))
+        _bump(by_priority, priority, sign * (end - begin))
+        # Split across midnights so each day gets only its own minutes
+        day = begin // 1440
+        while begin < end:
+            boundary = (day + 1) * 1440
+            _bump(by_day, (day, category), sign * (min(end, boundary) - begin))
+            begin = boundary
+            day += 1
+
+    def _delete(self, sid):
+        row = (self._start[sid], self._end[sid], self._task[sid],
+               self._priority[sid], self._category[sid], sid, self._rule[sid])
+        self._intervals.remove(self._start[sid], sid)
+        self._alive[sid] = 0
+        self._projected.discard(sid)
+        self._count -= 1
+        self._tally(row[0], row[1], row[3], row[4], -1)
+        if self._journal is not None:
+            self._journal.append(('remove', row))
+        return row
+
+    def remove(self, sid):
+        if sid not in self:
+            raise KeyError(sid)
+        session = self.get(sid)
+        row = self._delete(sid)
+        self._changed([('remove', sid)], [('remove', row)])
+        return session
+
+    def clear(self):
+        # The old columns are kept by reference, not copied, for undo.
+        entry = ('clear', self._columns())
+        if self._journal is not None:
+            self._journal.append(entry)
+        self._reset()
+        self._changed([('clear', None)], [entry])
+
+    def get(self, sid):
+        if sid not in self:
+            raise KeyError(sid)
+        return Session(sid, from_minutes(self._start[sid]), from_minutes(self._end[sid]),
+                       self.tasks[self._task[sid]],
+                       self.priorities[self._priority[sid]],
+                       self.categories[self._category[sid]],
+                       self.rule_of(sid))
+
+    def projected(self):
+        # Ids of live sessions generated from recurrence rules, in id order.
+        return sorted(self._projected)
+
+    def rule_of(self, sid):
+        rule = self._rule[sid]
+        return None if rule < 0 else rule
+
+    def ids(self):
+        return list(self._intervals.ids())
+
+    def position(self, sid):
+        if sid not in self:
+            raise KeyError(sid)
+        return self._intervals.rank(self._start[sid], sid)
+
+    def index_at(self, moment):
+        # Position of the first session starting at or after moment.
+        return self._intervals.rank(to_minutes(moment))
+
+    def session_at(self, index):
+        return self.get(self._intervals.select(index))
+
+    def window(self, offset, count):
+        for sid in islice(self._intervals.ids(max(offset, 0)), max(count, 0)):
+            yield self.get(sid)
+
+    def raw_columns(self):
+        # The underlying columns, indexed by id and including tombstoned rows
+        # (alive == 0); for zero-copy bulk readers such as analytics. Treat
+        # as read-only.
+        return {
+            'start': self._start,
+            'end': self._end,
+            'task': self._task,
+            'priority': self._priority,
+            'category': self._category,
+            'alive': self._alive
+        }
+
+    def rows(self):
+        # Raw (start, end, task, priority, category) tuples in start order,
+        # with times in minutes; cheaper than Session records for bulk reads.
+        for sid in self._intervals.ids():
+            yield (self._start[sid], self._end[sid],
+                   self.tasks[self._task[sid]],
+                   self.priorities[self._priority[sid]],
+                   self.categories[self._category[sid]])
+
+    def sessions(self):
+        for sid in self._intervals.ids():
+            yield self.get(sid)
+
+    def latest_end(self):
+        latest = self._intervals.max_end()
+        return None if latest is None else from_minutes(latest)
+
+    def category_totals(self):
+        return {self.categories[code]: minutes for code, minutes in self._totals[0].items()}
+
+    def priority_totals(self):
+        return {self.priorities[code]: minutes for code, minutes in self._totals[1].items()}
+
+    def day_total(self, day, category=None):
+        number = (datetime.combine(day, datetime.min.time()) - EPOCH).days
+        by_day = self._totals[2]
+        if category is not None:
+            code = self.categories.codes.get(category)
+            return by_day.get((number, code), 0)
+        return sum(by_day.get((number, code), 0) for code in range(len(self.categories.values)))
+
+    def progress(self, day, category="Study"):
+        goal = self.goals.for_day(day)
+        return min(1.0, self.day_total(day, category) / goal) if goal else 1.0
+
+    def conflicts(self, start, duration):
+        begin = to_minutes(start)
+        return [self.get(sid) for sid in self._intervals.overlapping(begin, begin + duration)]
+
+    def find_gap(self, duration, after=None):
+        after = after or datetime.now()
+        return from_minutes(self._intervals.find_gap(to_minutes(after), duration))
+
+    def next_start(self, now=None):
+        latest = self.latest_end()
+        if latest is not None:
+            return latest
+        now = now or datetime.now()
+        return now.replace(second=0, microsecond=0)
@@ -0,0 +1,227 @@
+import csv
+import itertools
+import re
+from datetime import datetime, timedelta, timezone
+
+from schedule_core import MAX_MINUTE, MIN_MINUTE, from_minutes, parse_duration, to_minutes
+
+# Streaming CSV and iCalendar import/export. Readers yield one record at a
+# time and records reach the Schedule in fixed-size batches, so memory stays
+# bounded by the batch size and each batch triggers a single refresh.
+
+CSV_FIELDS = ("start", "duration", "task", "priority", "category")
+CSV_TIME_FORMAT = "%Y-%m-%d %H:%M"
+MAX_REPORTED_ERRORS = 100
+
+_ICS_DURATION = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+class ImportReport:
+    def __init__(self):
+        self.added = 0
+        self.skipped = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def _priority(value):
+    value = (value or "").strip().capitalize()
+    return value if value in ("High", "Medium", "Low") else "Medium"
+
+
+def _check_start(start):
+    # Checked per row: one far-off date must not abort the batch around it.
+    if not MIN_MINUTE <= to_minutes(start) <= MAX_MINUTE:
+        raise ValueError(f"start {start:%Y-%m-%d %H:%M} is out of range")
+    return start
+
+
+def read_csv(stream, report):
+    # Rows need duration and task; a blank start appends after the
+    # previous session, matching the Add Session button.
+    reader = csv.DictReader(stream)
+    for row in reader:
+        try:
+            duration = parse_duration(row.get("duration", ""))
+            task = (row.get("task") or "").strip()
+            if not task:
+                raise ValueError("missing task")
+            start = (row.get("start") or "").strip()
+            start = _check_start(datetime.strptime(start, CSV_TIME_FORMAT)) if start else None
+        except ValueError as exc:
+            report.error(reader.line_num, str(exc))
+            continue
+        yield (start, duration, task, _priority(row.get("priority")),
+               (row.get("category") or "").strip() or "Study")
+
+
+def _unfold(stream):
+    # RFC 5545 content lines may be folded onto continuation lines that
+    # start with a space or tab.
+    current = None
+    for raw in stream:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and current is not None:
+            current += raw[1:]
+            continue
+        if current is not None:
+            yield current
+        current = raw
+    if current is not None:
+        yield current
+
+
+def _ics_unescape(value):
+    return (value.replace("\\n", " ").replace("\\N", " ").replace("\\,", ",")
+            .replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _ics_time(value, params):
+    if "VALUE=DATE" in params or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d"), True
+    moment = datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        moment = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return moment, False
+
+
+def _ics_duration(value):
+    match = _ICS_DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"bad DURATION {value!r}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    total = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                      minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -total if sign == "-" else total
+
+
+def _ics_priority(value):
+    try:
+        level = int(value)
+    except ValueError:
+        return "Medium"
+    if 1 <= level <= 4:
+        return "High"
+    if 6 <= level <= 9:
+        return "Low"
+    return "Medium"
+
+
+def read_ics(stream, report):
+    event = None
+    for line_no, line in enumerate(_unfold(stream), 1):
+        if line == "BEGIN:VEVENT":
+            event = {"line": line_no}
+            continue
+        if event is None:
+            continue
+        if line == "END:VEVENT":
+            record = _ics_record(event, report)
+            if record is not None:
+                yield record
+            event = None
+            continue
+
+        name, _, value = line.partition(":")
+        name, _, params = name.partition(";")
+        event[name.upper()] = (value, params.upper())
+
+
+def _ics_record(event, report):
+    try:
+        if "DTSTART" not in event:
+            raise ValueError("missing DTSTART")
+        start, all_day = _ics_time(*event["DTSTART"])
+        _check_start(start)
+        if "DTEND" in event:
+            length = _ics_time(*event["DTEND"])[0] - start
+        elif "DURATION" in event:
+            length = _ics_duration(event["DURATION"][0])
+        else:
+            length = timedelta(days=1) if all_day else timedelta(0)
+        duration = parse_duration(int(length.total_seconds() // 60))
+    except ValueError as exc:
+        report.error(event["line"], str(exc))
+        return None
+
+    task = _ics_unescape(event.get("SUMMARY", ("Untitled", ""))[0]) or "Untitled"
+    priority = _ics_priority(event.get("PRIORITY", ("0", ""))[0])
+    category = _ics_unescape(event.get("CATEGORIES", ("", ""))[0]).split(",")[0].strip()
+    return (start, duration, task, priority, category or "Study")
+
+
+def batches(records, size):
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_batches(schedule, records, report, batch_size=1000):
+    # Generator adding one batch per step; drive it from a loop, or from
+    # after() callbacks to keep a window responsive during large imports.
+    for batch in batches(records, batch_size):
+        report.added += len(schedule.add_many(batch))
+        yield report
+
+
+def import_file(schedule, path, batch_size=1000):
+    report = ImportReport()
+    with open(path, newline="", encoding="utf-8") as stream:
+        for _ in import_batches(schedule, open_records(path, stream, report), report,
+                                batch_size):
+            pass
+    return report
+
+
+def open_records(path, stream, report):
+    if path.lower().endswith((".ics", ".ical", ".ifb")):
+        return read_ics(stream, report)
+    return read_csv(stream, report)
+
+
+def write_csv(schedule, stream):
+    writer = csv.writer(stream)
+    writer.writerow(CSV_FIELDS)
+    for start, end, task, priority, category in schedule.rows():
+        writer.writerow((from_minutes(start).strftime(CSV_TIME_FORMAT), end - start,
+                         task, priority, category))
+
+
+def _ics_escape(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\n", "\\n"))
+
+
+def write_ics(schedule, stream):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    levels = {"High": 1, "Medium": 5, "Low": 9}
+    stream.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+                 "PRODID:-//Pastel Student Scheduler//EN\r\n")
+    for index, (start, end, task, priority, category) in enumerate(schedule.rows()):
+        stream.write(
+            "BEGIN:VEVENT\r\n"
+            f"UID:session-{start}-{index}@pastel-scheduler\r\n"
+            f"DTSTAMP:{stamp}\r\n"
+            f"DTSTART:{from_minutes(start):%Y%m%dT%H%M%S}\r\n"
+            f"DTEND:{from_minutes(end):%Y%m%dT%H%M%S}\r\n"
+            f"SUMMARY:{_ics_escape(task)}\r\n"
+            f"PRIORITY:{levels.get(priority, 0)}\r\n"
+            f"CATEGORIES:{_ics_escape(category)}\r\n"
+            "END:VEVENT\r\n")
+    stream.write("END:VCALENDAR\r\n")
+
+
+def export_file(schedule, path):
+    with open(path, "w", newline="", encoding="utf-8") as stream:
+        if path.lower().endswith((".ics", ".ical")):
+            write_ics(schedule, stream)
+        else:
+            write_csv(schedule, stream)
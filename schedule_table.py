@@ -0,0 +1,135 @@
+# Keeps a ttk.Treeview in step with a Schedule by applying change events
+# to the rows that are on screen. Only one page of rows is materialised,
+# so very large schedules cost no more to display than small ones.
+
+from metrics import timed
+
+
+def row_values(session):
+    return (
+        session.start.strftime("%H:%M"),
+        session.task,
+        f"{session.duration} min",
+        session.priority
+    )
+
+
+class ScheduleTable:
+    def __init__(self, tree, schedule, page_size=200, on_page_change=None):
+        self.tree = tree
+        self.schedule = schedule
+        self.page_size = page_size
+        self.on_page_change = on_page_change
+        self.offset = 0
+        schedule.subscribe(self.apply)
+        self.refresh()
+
+    @timed("table.refresh")
+    def refresh(self):
+        total = len(self.schedule)
+        if self.offset >= total:
+            self.offset = max(0, (total - 1) // self.page_size * self.page_size)
+
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for session in self.schedule.window(self.offset, self.page_size):
+            self.tree.insert("", "end", iid=str(session.id), values=row_values(session))
+        self._report()
+
+    @timed("table.apply")
+    def apply(self, changes):
+        if len(changes) > 1:
+            # Row positions come from the schedule's final state, which
+            # replaying a batch one change at a time can disagree with;
+            # rebuilding the single page shown is cheap and always right.
+            self.refresh()
+            return
+
+        for op, sid in changes:
+            if op == 'clear':
+                self.offset = 0
+                children = self.tree.get_children()
+                if children:
+                    self.tree.delete(*children)
+            elif op == 'add':
+                self._insert_row(sid)
+            elif op == 'remove':
+                self._remove_row(sid)
+            elif op == 'update':
+                self._update_row(sid)
+        self._report()
+
+    def _insert_row(self, sid):
+        index = self.schedule.position(sid) - self.offset
+        if index >= self.page_size:
+            return
+        if index < 0:
+            self.refresh()
+            return
+
+        self.tree.insert("", index, iid=str(sid), values=row_values(self.schedule.get(sid)))
+        children = self.tree.get_children()
+        if len(children) > self.page_size:
+            self.tree.delete(children[-1])
+
+    def _remove_row(self, sid):
+        iid = str(sid)
+        if not self.tree.exists(iid):
+            # Off-page rows only matter if they came before the page, in
+            # which case the first shown row has moved up one position.
+            children = self.tree.get_children()
+            if self.offset and (not children
+                                or self.schedule.position(int(children[0])) != self.offset):
+                self.refresh()
+            return
+
+        self.tree.delete(iid)
+        shown = len(self.tree.get_children())
+        if not shown and self.offset:
+            self.refresh()
+        elif self.offset + shown < len(self.schedule):
+            session = self.schedule.session_at(self.offset + shown)
+            self.tree.insert("", "end", iid=str(session.id), values=row_values(session))
+
+    def _update_row(self, sid):
+        iid = str(sid)
+        index = self.schedule.position(sid) - self.offset
+        children = self.tree.get_children()
+        if self.tree.exists(iid):
+            if 0 <= index < len(children):
+                self.tree.item(iid, values=row_values(self.schedule.get(sid)))
+                self.tree.move(iid, "", index)
+            else:
+                self.refresh()
+        elif 0 <= index < self.page_size or (
+                children and self.schedule.position(int(children[0])) != self.offset):
+            # Moved onto the page, or across it so the page has shifted
+            self.refresh()
+
+    def next_page(self):
+        if self.offset + self.page_size < len(self.schedule):
+            self.offset += self.page_size
+            self.refresh()
+
+    def prev_page(self):
+        if self.offset:
+            self.offset = max(0, self.offset - self.page_size)
+            self.refresh()
+
+    def see(self, sid):
+        offset = self.schedule.position(sid) // self.page_size * self.page_size
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+        self.tree.see(str(sid))
+
+    def _report(self):
+        if self.on_page_change is None:
+            return
+        total = len(self.schedule)
+        shown = len(self.tree.get_children())
+        if total:
+            self.on_page_change(f"{self.offset + 1}-{self.offset + shown} of {total}")
+        else:
+            self.on_page_change("No sessions")
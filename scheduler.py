@@ -1,44 +1,139 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
+import argparse
+import csv
 from datetime import datetime, timedelta
 import time
-import threading
 import random
-import winsound
+try:
+    import tkinter as tk
+    from tkinter import ttk, messagebox, filedialog
+except ImportError:  # servers without Tk can still run headless
+    tk = None
+from schedule_core import Schedule, parse_clock_time, parse_duration
+from schedule_table import ScheduleTable
+import sound
+from timers import AfterDriver, RUNNING, PAUSED, TimerService
+from ui_events import UIEventQueue
+from storage import DEFAULT_PATH, ScheduleStore, day_window
+from schedule_io import ImportReport, export_file, import_batches, import_file, open_records
+from recurrence import RecurrenceRule, RecurrenceSet, parse_weekdays
+from history import History
+from planner import DEFAULT_HOURS, PlanTask, availability, parse_hours, plan_into
+from chart_export import FORMATS, PALETTE
+import metrics
+from metrics import timed
+
+TIMER_REFRESH_MS = 250  # upper bound on how often the countdown repaints
+PROJECTION_DAYS = 7     # days of recurring occurrences kept in the schedule
+PLAN_DAYS = 7           # how far ahead Auto Plan may place work
 
 class PastelStudentScheduler:
-    def __init__(self, root):
+    def __init__(self, root, store_path=DEFAULT_PATH):
         self.root = root
-        self.schedule_data = []
-        self.current_timers = []
+        self.charts = None
+        self.alarm_sound = sound.detect(root)
+        self.schedule = Schedule()
+        self.store = ScheduleStore(store_path, on_error=self.on_store_error)
+        self.store.attach(self.schedule)
+        self._store_warning = False
+        self._loader = None
+        self.recurrences = RecurrenceSet()
+        self.history = History(self.schedule)
+        self.ui_events = UIEventQueue()
+        self.timers = TimerService(on_expire=self.on_timer_expired)
+        self.timer_driver = AfterDriver(self.timers, root.after, root.after_cancel)
+        self._timer_refresh = None
         self.motivational_quotes = self.load_quotes()
         
         # Initialize variables
         self.task_var = tk.StringVar()
         self.duration_var = tk.StringVar(value="45")
         self.priority_var = tk.StringVar(value="Medium")
+        self.start_var = tk.StringVar()
+        self.repeat_var = tk.StringVar()
+        self.until_var = tk.StringVar()
         self.timer_var = tk.StringVar(value="25")
         self.progress_var = tk.StringVar(value="0%")
+        self.goal_var = tk.StringVar(value=str(self.schedule.goals.default // 60))
+        self.page_var = tk.StringVar(value="No sessions")
         
-        # Pastel color palette
-        self.colors = {
-            'bg': '#fafafa',
-            'card': '#ffffff',
-            'primary': '#a8d8ea',      # Soft blue
-            'secondary': '#aa96da',    # Soft purple
-            'accent': '#ffd3b6',       # Soft peach
-            'success': '#c7ecee',      # Mint
-            'warning': '#ffaaa5',      # Soft coral
-            'text': '#2d3436',         # Dark gray
-            'border': '#dfe6e9'        # Light gray
-        }
+        # Pastel color palette, shared with off-screen chart exports
+        self.colors = dict(PALETTE)
         
         self.setup_ui()
+        self.ui_events.attach(self.root)
         self.start_clock()
-        
+        self.load_saved_state()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def load_saved_state(self):
+        # Today's sessions first; the rest of the history streams in from
+        # idle callbacks so a large archive doesn't delay the first paint.
+        # Loading is not something to undo.
+        window = day_window()
+        with self.history.paused():
+            self.store.load_window(self.schedule, *window)
+        self._loader = self.store.load_remaining(self.schedule, *window)
+        self.root.after(1, self.load_next_chunk)
+        
+        for rid, data in self.store.load_rules():
+            self.recurrences.add(RecurrenceRule.from_dict(data, rid))
+        self.project_recurrences()
+        
+        now = time.time()
+        for label, duration, deadline, remaining in self.store.load_timers():
+            tid = self.timers.start(remaining if deadline is None else max(0, deadline - now), label)
+            self.timers.get(tid).duration = duration
+            if deadline is None:
+                self.timers.pause(tid)
+        self.update_timer_display()
+    
+    def load_next_chunk(self):
+        if self._loader is None:
+            return
+        try:
+            with self.history.paused():
+                next(self._loader)
+        except StopIteration:
+            self._loader = None
+            return
+        self.root.after(1, self.load_next_chunk)
+    
+    def project_recurrences(self):
+        # Only the coming week of each recurring rule lives in the schedule;
+        # the window rolls forward at midnight.
+        start = day_window()[0]
+        with self.history.paused():
+            self.recurrences.project(self.schedule, start,
+                                     start + timedelta(days=PROJECTION_DAYS))
+        tomorrow = start + timedelta(days=1)
+        delay = int((tomorrow - datetime.now()).total_seconds() * 1000) + 1000
+        self.root.after(delay, self.project_recurrences)
+    
+    def save_timers(self):
+        self.store.save_timers(self.timers.timers())
+    
+    def on_store_error(self, exc, op):
+        # Called on the store's writer thread
+        self.ui_events.post(self.show_store_error, exc, op)
+    
+    def show_store_error(self, exc, op):
+        # One dialog at a time, however many changes fail in a row
+        if self._store_warning:
+            return
+        self._store_warning = True
+        try:
+            messagebox.showwarning("Save Failed",
+                                   f"A change ({op}) could not be saved to {self.store.path}:\n{exc}")
+        finally:
+            self._store_warning = False
+    
+    def on_close(self):
+        self.save_timers()
+        self.store.close()
+        self.root.destroy()
+        if metrics.registry.enabled:
+            print(metrics.registry.report())
+    
     def load_quotes(self):
         return [
             "Small steps every day lead to big achievements",
@@ -121,15 +216,26 @@ class PastelStudentScheduler:
                                     values=["High", "Medium", "Low"], width=15)
         priority_combo.grid(row=2, column=1, pady=5, padx=5, sticky='w')
         
+        # Optional fixed start; blank appends after the last session
+        self.create_input_field(fields_frame, "Start (HH:MM):", 3, self.start_var)
+        
+        # Optional repetition, e.g. "Mon Wed Fri"; needs a start time
+        self.create_input_field(fields_frame, "Repeat on:", 4, self.repeat_var)
+        # Also the deadline for Auto Plan
+        self.create_input_field(fields_frame, "Until (YYYY-MM-DD):", 5, self.until_var)
+        
         # Buttons
         button_frame = tk.Frame(input_frame, bg=self.colors['card'])
         button_frame.pack(fill='x', pady=10)
         
         buttons = [
             ("Add Session", self.add_session, self.colors['secondary']),
+            ("Auto Plan", self.auto_plan, self.colors['primary']),
             ("Water Break", self.add_water_break, self.colors['success']),
             ("Food Break", self.add_food_break, self.colors['accent']),
-            ("Clear All", self.clear_schedule, self.colors['warning'])
+            ("Clear All", self.clear_schedule, self.colors['warning']),
+            ("Import", self.import_schedule, self.colors['border']),
+            ("Export", self.export_schedule, self.colors['border'])
         ]
         
         for text, command, color in buttons:
@@ -158,6 +264,38 @@ class PastelStudentScheduler:
                 bg=self.colors['card'], 
                 fg=self.colors['text']).pack(pady=10)
         
+        # Page controls; only one page of rows is kept in the tree
+        nav_frame = tk.Frame(schedule_frame, bg=self.colors['card'])
+        nav_frame.pack(side='bottom', fill='x', padx=10, pady=(0, 5))
+        
+        tk.Button(nav_frame, text="< Prev", command=lambda: self.schedule_table.prev_page(),
+                 bg=self.colors['border'], fg=self.colors['text'],
+                 font=('Arial', 9), relief='flat').pack(side='left')
+        tk.Button(nav_frame, text="Next >", command=lambda: self.schedule_table.next_page(),
+                 bg=self.colors['border'], fg=self.colors['text'],
+                 font=('Arial', 9), relief='flat').pack(side='right')
+        tk.Label(nav_frame, textvariable=self.page_var, bg=self.colors['card'],
+                fg=self.colors['text'], font=('Arial', 9)).pack()
+        
+        # Edit controls; every change can be undone step by step
+        edit_frame = tk.Frame(schedule_frame, bg=self.colors['card'])
+        edit_frame.pack(side='bottom', fill='x', padx=10, pady=(0, 5))
+        
+        self.undo_button, self.redo_button = [
+            tk.Button(edit_frame, text=text, command=command, state='disabled',
+                     bg=self.colors['border'], fg=self.colors['text'],
+                     font=('Arial', 9), relief='flat')
+            for text, command in (("Undo", self.undo), ("Redo", self.redo))
+        ]
+        for text, command, color in (("Update", self.update_session, self.colors['primary']),
+                                     ("Remove", self.remove_session, self.colors['warning'])):
+            tk.Button(edit_frame, text=text, command=command,
+                     bg=color, fg=self.colors['text'],
+                     font=('Arial', 9), relief='flat').pack(side='left', padx=(0, 5))
+        self.redo_button.pack(side='right')
+        self.undo_button.pack(side='right', padx=5)
+        self.history.listeners.append(self.update_history_buttons)
+        
         # Treeview for schedule
         columns = ("Time", "Task", "Duration", "Priority")
         self.schedule_tree = ttk.Treeview(schedule_frame, columns=columns, 
@@ -174,6 +312,14 @@ class PastelStudentScheduler:
                                  command=self.schedule_tree.yview)
         self.schedule_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side='right', fill='y')
+        
+        # Rows follow schedule changes; see ScheduleTable.apply
+        self.schedule_table = ScheduleTable(self.schedule_tree, self.schedule,
+                                            on_page_change=self.page_var.set)
+        self.schedule_tree.bind('<<TreeviewSelect>>', self.on_session_select)
+        self.schedule_tree.bind('<Delete>', self.remove_session)
+        self.root.bind('<Control-z>', self.undo)
+        self.root.bind('<Control-y>', self.redo)
     
     def create_timer_section(self, parent):
         timer_frame = tk.Frame(parent, bg=self.colors['card'], relief='flat',
@@ -212,6 +358,12 @@ class PastelStudentScheduler:
                              font=('Arial', 9), relief='flat')
         timer_btn.pack(side='left', padx=5)
         
+        for text, command in (("Pause", self.toggle_pause_timers),
+                              ("Cancel", self.cancel_timers)):
+            tk.Button(control_frame, text=text, command=command,
+                     bg=self.colors['border'], fg=self.colors['text'],
+                     font=('Arial', 9), relief='flat').pack(side='left', padx=5)
+        
         # Active timer display
         self.timer_display = tk.Label(timer_frame, text="No active timers", 
                                      font=('Arial', 10), 
@@ -230,17 +382,34 @@ class PastelStudentScheduler:
                 bg=self.colors['card'], 
                 fg=self.colors['text']).pack(pady=10)
         
+        # matplotlib is the slowest import by far, so the figure is built
+        # once the window has been painted
+        self.viz_frame = viz_frame
+        self.root.after_idle(lambda: self.root.after(1, self.create_charts))
+    
+    def create_charts(self):
+        import matplotlib
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from charts import ScheduleCharts
+        
         # Create minimal matplotlib figure
-        plt.rcParams['font.size'] = 9
-        self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(8, 3))
+        matplotlib.rcParams['font.size'] = 9
+        self.fig = Figure(figsize=(8, 3))
+        self.ax1, self.ax2 = self.fig.subplots(1, 2)
         self.fig.patch.set_facecolor(self.colors['card'])
         
         for ax in [self.ax1, self.ax2]:
             ax.set_facecolor(self.colors['card'])
         
-        self.canvas = FigureCanvasTkAgg(self.fig, viz_frame)
+        self.canvas = FigureCanvasTkAgg(self.fig, self.viz_frame)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=5)
+        # The real render happens later, inside draw_idle's callback
+        self.canvas.draw = timed("charts.draw")(self.canvas.draw)
         
+        # Artists are kept alive and redraws coalesced; see ScheduleCharts
+        self.charts = ScheduleCharts(self.fig, self.ax1, self.ax2, self.canvas,
+                                     self.schedule, self.colors, after=self.root.after)
         self.update_visualizations()
     
     def create_motivation_section(self, parent):
@@ -279,6 +448,20 @@ class PastelStudentScheduler:
                                      font=('Arial', 9))
         self.progress_label.pack()
         
+        goal_frame = tk.Frame(progress_frame, bg=self.colors['card'])
+        goal_frame.pack(pady=(5, 0))
+        tk.Label(goal_frame, text="Daily goal (h):", bg=self.colors['card'],
+                font=('Arial', 9)).pack(side='left', padx=5)
+        goal_spin = tk.Spinbox(goal_frame, from_=1, to=16, textvariable=self.goal_var,
+                              width=5, font=('Arial', 9), command=self.set_daily_goal)
+        goal_spin.bind('<Return>', lambda event: self.set_daily_goal())
+        goal_spin.pack(side='left', padx=5)
+        
+        # Progress reads the schedule's running totals, so it can follow
+        # every change without rescanning the sessions
+        self.schedule.subscribe(lambda changes: self.update_progress())
+        self.update_progress()
+        
         # New quote button
         quote_btn = tk.Button(mot_frame, text="New Motivation", 
                              command=self.new_motivation,
@@ -290,14 +473,10 @@ class PastelStudentScheduler:
         self.new_motivation()
     
     def start_clock(self):
-        def update_time():
-            while True:
-                current_time = datetime.now().strftime("%H:%M:%S")
-                self.time_label.config(text=current_time)
-                time.sleep(1)
-        
-        clock_thread = threading.Thread(target=update_time, daemon=True)
-        clock_thread.start()
+        now = datetime.now()
+        self.time_label.config(text=now.strftime("%H:%M:%S"))
+        # Wake just after the next second boundary rather than drifting
+        self.root.after(1000 - now.microsecond // 1000, self.start_clock)
     
     def add_session(self):
         task = self.task_var.get().strip()
@@ -308,128 +487,236 @@ class PastelStudentScheduler:
             return
         
         try:
-            duration = int(duration)
-            if duration <= 0:
-                raise ValueError
+            duration = parse_duration(duration)
         except ValueError:
             messagebox.showwarning("Input Error", "Please enter valid duration")
             return
         
-        start_time = self.calculate_start_time()
-        end_time = start_time + timedelta(minutes=duration)
+        if self.repeat_var.get().strip():
+            self.add_recurring_session(task, duration)
+            return
         
-        session = {
-            'start': start_time,
-            'end': end_time,
-            'task': task,
-            'duration': duration,
-            'priority': self.priority_var.get(),
-            'category': 'Study'
-        }
+        if self.start_var.get().strip():
+            try:
+                start_time = parse_clock_time(self.start_var.get(), datetime.now())
+            except ValueError:
+                messagebox.showwarning("Input Error", "Please enter start time as HH:MM")
+                return
+            
+            conflicts = self.schedule.conflicts(start_time, duration)
+            if conflicts:
+                gap = self.schedule.find_gap(duration, start_time)
+                if not messagebox.askyesno("Schedule Conflict",
+                                           f"Overlaps '{conflicts[0].task}' at "
+                                           f"{conflicts[0].start:%H:%M}.\n"
+                                           f"Place it at {gap:%H:%M} instead?"):
+                    return
+                start_time = gap
+        else:
+            start_time = self.calculate_start_time()
         
-        self.schedule_data.append(session)
-        self.update_schedule_display()
-        self.update_visualizations()
-        self.update_progress()
+        sid = self.schedule.add(start_time, duration, task, self.priority_var.get())
+        self.schedule_table.see(sid)
+        
+        self.task_var.set("")
+        self.start_var.set("")
+    
+    def add_recurring_session(self, task, duration):
+        try:
+            weekdays = parse_weekdays(self.repeat_var.get())
+            at = datetime.strptime(self.start_var.get().strip(), "%H:%M")
+            until = self.until_var.get().strip()
+            until = datetime.strptime(until, "%Y-%m-%d").date() if until else None
+        except ValueError:
+            messagebox.showwarning("Input Error",
+                                   "Repeat needs weekdays (e.g. Mon Wed Fri), a start "
+                                   "time as HH:MM and an optional end date as YYYY-MM-DD")
+            return
+        
+        rule = RecurrenceRule(task, duration, weekdays, at.hour * 60 + at.minute,
+                              datetime.now().date(), until, self.priority_var.get())
+        self.recurrences.add(rule)
+        self.store.save_rule(rule)
+        self.reproject()
         
         self.task_var.set("")
+        self.start_var.set("")
+        self.repeat_var.set("")
+        self.until_var.set("")
+    
+    def reproject(self):
+        # Rule changes are saved with the rule rather than as undo steps.
+        with self.history.paused():
+            self.recurrences.reproject(self.schedule)
+    
+    def selected_session(self):
+        selection = self.schedule_tree.selection()
+        if not selection:
+            messagebox.showinfo("No Selection", "Select a session in the schedule first")
+            return None
+        return self.schedule.get(int(selection[0]))
+    
+    def on_session_select(self, event=None):
+        # Loads the selected session into the input fields for editing.
+        selection = self.schedule_tree.selection()
+        if not selection:
+            return
+        session = self.schedule.get(int(selection[0]))
+        self.task_var.set(session.task)
+        self.duration_var.set(str(session.duration))
+        self.priority_var.set(session.priority)
+        self.start_var.set(session.start.strftime("%H:%M"))
+    
+    def update_session(self):
+        # Applies the input fields to the selected session; a new start
+        # time moves it within the same day.
+        session = self.selected_session()
+        if session is None:
+            return
+        task = self.task_var.get().strip()
+        try:
+            duration = parse_duration(self.duration_var.get())
+            at = self.start_var.get().strip()
+            at = datetime.strptime(at, "%H:%M").time() if at else session.start.time()
+        except ValueError:
+            messagebox.showwarning("Input Error", "Please enter valid duration and start as HH:MM")
+            return
+        if not task:
+            messagebox.showwarning("Input Error", "Please enter subject and duration")
+            return
+        start = datetime.combine(session.start.date(), at)
+        
+        rule, day = self.recurrences.occurrence_day(self.schedule, session.id)
+        if rule is not None:
+            # A repeating session: change only this occurrence
+            rule.override(day, at=at.hour * 60 + at.minute,
+                          duration=duration, task=task, priority=self.priority_var.get())
+            self.store.save_rule(rule)
+            self.reproject()
+            return
+        
+        self.schedule.update(session.id, start, duration, task, self.priority_var.get())
+        self.schedule_table.see(session.id)
+    
+    def remove_session(self, event=None):
+        session = self.selected_session()
+        if session is None:
+            return
+        rule, day = self.recurrences.occurrence_day(self.schedule, session.id)
+        if rule is None:
+            self.schedule.remove(session.id)
+            return
+        
+        answer = messagebox.askyesnocancel(
+            "Repeating Session",
+            f"Remove every repeat of '{session.task}'?\n"
+            "Yes removes them all, No removes only this one.")
+        if answer is None:
+            return
+        if answer:
+            self.recurrences.remove(rule.id)
+            self.store.delete_rule(rule.id)
+        else:
+            rule.skip(day)
+            self.store.save_rule(rule)
+        self.reproject()
+    
+    def undo(self, event=None):
+        self.after_revert(self.history.undo())
+    
+    def redo(self, event=None):
+        self.after_revert(self.history.redo())
+    
+    def after_revert(self, step):
+        # Reverting a clear swaps whole columns back in, dropping the
+        # repeating sessions projected since; project them again.
+        if step and any(op == 'clear' for op, _ in step):
+            self.reproject()
+    
+    def update_history_buttons(self, history):
+        self.undo_button.config(state='normal' if history.can_undo() else 'disabled')
+        self.redo_button.config(state='normal' if history.can_redo() else 'disabled')
+    
+    def auto_plan(self):
+        # Splits the entered subject into focus blocks with breaks and packs
+        # them into free study hours over the coming week.
+        task = self.task_var.get().strip()
+        try:
+            duration = parse_duration(self.duration_var.get())
+            until = self.until_var.get().strip()
+            deadline = datetime.strptime(until, "%Y-%m-%d") + timedelta(days=1) if until else None
+        except ValueError:
+            messagebox.showwarning("Input Error",
+                                   "Please enter valid duration and a due date as YYYY-MM-DD")
+            return
+        if not task:
+            messagebox.showwarning("Input Error", "Please enter subject and duration")
+            return
+        
+        self.plan_tasks([PlanTask(task, duration, self.priority_var.get(), deadline)])
+        self.task_var.set("")
+        self.until_var.set("")
+    
+    def plan_tasks(self, tasks, days=PLAN_DAYS, hours=DEFAULT_HOURS):
+        now = datetime.now()
+        windows = availability(now.date(), days, parse_hours(hours))
+        result, sids = plan_into(self.schedule, tasks, windows, after=now)
+        if sids:
+            self.schedule_table.see(sids[0])
+        problems = [f"{task}: {minutes} min did not fit" for task, minutes in result.unplaced]
+        problems += [f"{task}: {minutes} min past its deadline" for task, minutes in result.late]
+        if problems:
+            messagebox.showinfo("Auto Plan", "\n".join(problems))
+        return result
+    
+    def add_sessions(self, records):
+        # Programmatic entry point: (task, duration[, priority[, category]])
+        # records are appended in order as one transaction, so the table,
+        # charts and progress bar refresh once for the whole batch.
+        planned = []
+        for record in records:
+            task, duration, *rest = record
+            priority = rest[0] if rest else "Medium"
+            category = rest[1] if len(rest) > 1 else "Study"
+            planned.append((None, parse_duration(duration), task, priority, category))
+        
+        sids = self.schedule.add_many(planned)
+        if sids:
+            self.schedule_table.see(sids[-1])
+        return sids
     
     def add_water_break(self):
-        self.task_var.set("Water Break")
-        self.duration_var.set("5")
-        self.priority_var.set("High")
-        self.add_session()
+        self.add_sessions([("Water Break", 5, "High", "Water Break")])
     
     def add_food_break(self):
-        self.task_var.set("Food Break")
-        self.duration_var.set("30")
-        self.priority_var.set("High")
-        self.add_session()
+        self.add_sessions([("Food Break", 30, "High", "Food Break")])
     
     def calculate_start_time(self):
-        if not self.schedule_data:
-            return datetime.now().replace(second=0, microsecond=0)
-        
-        last_session = max(self.schedule_data, key=lambda x: x['end'])
-        return last_session['end']
-    
-    def update_schedule_display(self):
-        for item in self.schedule_tree.get_children():
-            self.schedule_tree.delete(item)
-        
-        sorted_schedule = sorted(self.schedule_data, key=lambda x: x['start'])
-        for session in sorted_schedule:
-            start_str = session['start'].strftime("%H:%M")
-            self.schedule_tree.insert("", "end", values=(
-                start_str,
-                session['task'],
-                f"{session['duration']} min",
-                session['priority']
-            ))
+        return self.schedule.next_start(datetime.now())
     
     def update_visualizations(self):
-        self.ax1.clear()
-        self.ax2.clear()
-        
-        if not self.schedule_data:
-            self.ax1.text(0.5, 0.5, 'Add study sessions\nto see analytics', 
-                         ha='center', va='center', transform=self.ax1.transAxes,
-                         fontsize=10, color=self.colors['text'])
-            self.ax2.text(0.5, 0.5, 'Add study sessions\nto see analytics', 
-                         ha='center', va='center', transform=self.ax2.transAxes,
-                         fontsize=10, color=self.colors['text'])
-        else:
-            # Time distribution
-            categories = {}
-            for session in self.schedule_data:
-                cat = session['category']
-                duration = session['duration']
-                categories[cat] = categories.get(cat, 0) + duration
-            
-            # Pastel colors for pie chart
-            pastel_colors = [self.colors['primary'], self.colors['secondary'], 
-                           self.colors['accent'], self.colors['success']]
-            
-            self.ax1.pie(categories.values(), labels=categories.keys(), 
-                        autopct='%1.0f%%', colors=pastel_colors[:len(categories)],
-                        startangle=90, textprops={'color': self.colors['text']})
-            self.ax1.set_title('Time Distribution', color=self.colors['text'])
-            
-            # Daily timeline
-            for i, session in enumerate(sorted(self.schedule_data, key=lambda x: x['start'])):
-                start = session['start']
-                duration = session['duration']
-                
-                color_map = {
-                    'Study': self.colors['primary'],
-                    'Water Break': self.colors['success'],
-                    'Food Break': self.colors['accent']
-                }
-                
-                color = color_map.get(session['task'], self.colors['secondary'])
-                
-                self.ax2.barh(i, duration, left=start.hour + start.minute/60, 
-                             color=color, alpha=0.8)
-        
-        self.ax2.set_yticks(range(len(self.schedule_data)))
-        self.ax2.set_yticklabels([s['task'] for s in sorted(self.schedule_data, key=lambda x: x['start'])])
-        self.ax2.set_xlabel('Time of Day', color=self.colors['text'])
-        self.ax2.set_title('Daily Schedule', color=self.colors['text'])
-        self.ax2.tick_params(colors=self.colors['text'])
-        
-        self.fig.tight_layout()
-        self.canvas.draw()
+        if self.charts is not None:
+            self.charts.request_redraw()
     
+    @timed("progress.update")
     def update_progress(self):
-        total_study_time = sum(session['duration'] for session in self.schedule_data 
-                             if session['category'] == 'Study')
-        
-        max_study_time = 6 * 60  # 6 hours target
-        progress_percent = min(100, (total_study_time / max_study_time) * 100)
+        progress_percent = self.schedule.progress(datetime.now().date()) * 100
         
         self.progress_bar['value'] = progress_percent
         self.progress_var.set(f"{progress_percent:.0f}%")
     
+    def set_daily_goal(self):
+        try:
+            hours = float(self.goal_var.get())
+            if hours <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Input Error", "Please enter a goal in hours")
+            return
+        
+        self.schedule.goals.default = int(hours * 60)
+        self.update_progress()
+    
     def start_timer(self):
         try:
             minutes = int(self.timer_var.get())
@@ -439,73 +726,235 @@ class PastelStudentScheduler:
             messagebox.showwarning("Input Error", "Please enter valid minutes")
             return
         
-        end_time = datetime.now() + timedelta(minutes=minutes)
-        timer_id = len(self.current_timers)
-        
-        timer_data = {
-            'id': timer_id,
-            'end_time': end_time,
-            'duration': minutes,
-            'active': True
-        }
-        
-        self.current_timers.append(timer_data)
-        
-        timer_thread = threading.Thread(target=self.run_timer, args=(timer_id,), daemon=True)
-        timer_thread.start()
+        self.timers.start(minutes * 60, f"{minutes} min")
+        self.save_timers()
         
         self.update_timer_display()
         messagebox.showinfo("Timer Started", f"Timer set for {minutes} minutes")
     
-    def run_timer(self, timer_id):
-        timer_data = next((t for t in self.current_timers if t['id'] == timer_id), None)
-        if not timer_data:
-            return
-        
-        while datetime.now() < timer_data['end_time'] and timer_data['active']:
-            time.sleep(1)
-        
-        if timer_data['active']:
-            self.trigger_alarm(f"Timer completed! {timer_data['duration']} minutes elapsed.")
-            self.current_timers = [t for t in self.current_timers if t['id'] != timer_id]
-            self.update_timer_display()
+    def on_timer_expired(self, timer):
+        # May be called from a timer driver thread; hand off to the Tk loop
+        self.ui_events.post(self.show_timer_alarm, timer)
+    
+    def show_timer_alarm(self, timer):
+        self.play_alarm_sound()
+        message = f"Timer completed! {timer.duration // 60} minutes elapsed."
+        if messagebox.askyesno("Alarm", f"{message}\n\nSnooze for 5 minutes?"):
+            self.timers.snooze(timer.id, 5 * 60)
+        else:
+            self.timers.dismiss(timer.id)
+        self.save_timers()
+        self.update_timer_display()
+    
+    def toggle_pause_timers(self):
+        timers = self.timers.timers()
+        if any(timer.state == RUNNING for timer in timers):
+            for timer in timers:
+                self.timers.pause(timer.id)
+        else:
+            for timer in timers:
+                self.timers.resume(timer.id)
+        self.save_timers()
+        self.update_timer_display()
+    
+    def cancel_timers(self):
+        for timer in self.timers.timers():
+            self.timers.cancel(timer.id)
+        self.save_timers()
+        self.update_timer_display()
     
+    @timed("timers.display")
     def update_timer_display(self):
-        if not self.current_timers:
+        timers = [t for t in self.timers.timers() if t.state in (RUNNING, PAUSED)]
+        if any(timer.state == RUNNING for timer in timers):
+            if self._timer_refresh is None:
+                self._timer_refresh = self.root.after(TIMER_REFRESH_MS, self.tick_timer_display)
+        
+        if not timers:
             self.timer_display.config(text="No active timers")
         else:
             timer_text = "Active timers:\n"
-            for timer in self.current_timers:
-                if timer['active']:
-                    remaining = timer['end_time'] - datetime.now()
-                    minutes = int(remaining.total_seconds() // 60)
-                    seconds = int(remaining.total_seconds() % 60)
-                    timer_text += f"{minutes:02d}:{seconds:02d} remaining\n"
+            for timer in timers:
+                remaining = self.timers.remaining(timer.id)
+                minutes = int(remaining // 60)
+                seconds = int(remaining % 60)
+                suffix = "paused" if timer.state == PAUSED else "remaining"
+                timer_text += f"{minutes:02d}:{seconds:02d} {suffix}\n"
             
             self.timer_display.config(text=timer_text)
     
-    def trigger_alarm(self, message):
+    def tick_timer_display(self):
+        self._timer_refresh = None
+        self.update_timer_display()
+    
+    def play_alarm_sound(self):
         try:
-            winsound.PlaySound("SystemExclamation", winsound.SND_ALIAS)
-        except:
+            self.alarm_sound.play()
+        except Exception:
             pass
-        
-        messagebox.showinfo("Alarm", message)
     
     def new_motivation(self):
         quote = random.choice(self.motivational_quotes)
         self.quote_label.config(text=quote)
     
+    def import_schedule(self):
+        path = filedialog.askopenfilename(
+            title="Import Schedule",
+            filetypes=[("Schedules", "*.csv *.ics"), ("CSV", "*.csv"),
+                       ("iCalendar", "*.ics"), ("All files", "*.*")])
+        if not path:
+            return
+        
+        try:
+            stream = open(path, newline="", encoding="utf-8")
+        except OSError as exc:
+            messagebox.showwarning("Import Error", f"Import stopped: {exc}")
+            return
+        report = ImportReport()
+        steps = import_batches(self.schedule, open_records(path, stream, report), report)
+        
+        # One batch per idle callback keeps the window responsive; each batch
+        # reaches the table and charts as a single change
+        def step():
+            try:
+                next(steps)
+            except (StopIteration, ValueError, UnicodeDecodeError, csv.Error, OSError) as exc:
+                stream.close()
+                if not isinstance(exc, StopIteration):
+                    messagebox.showwarning("Import Error", f"Import stopped: {exc}")
+                    return
+                message = f"Imported {report.added} sessions"
+                if report.skipped:
+                    line, reason = report.errors[0]
+                    message += f"\nSkipped {report.skipped} (line {line}: {reason})"
+                messagebox.showinfo("Import Complete", message)
+                return
+            self.root.after(1, step)
+        
+        step()
+    
+    def export_schedule(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Schedule", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("iCalendar", "*.ics"),
+                       ("Chart image", "*.png"), ("Chart (SVG)", "*.svg"), ("Chart (PDF)", "*.pdf")])
+        if not path:
+            return
+        if path.rsplit(".", 1)[-1].lower() in FORMATS:
+            from chart_export import export_chart
+            export_chart(self.schedule, path)
+        else:
+            export_file(self.schedule, path)
+    
     def clear_schedule(self):
-        if messagebox.askyesno("Clear Schedule", "Clear entire schedule?"):
-            self.schedule_data.clear()
-            self.update_schedule_display()
-            self.update_visualizations()
-            self.update_progress()
+        if messagebox.askyesno("Clear Schedule", "Clear entire schedule?\n"
+                               "(Undo brings it back; repeating sessions stay.)"):
+            # Finish loading first so Undo can bring back every session.
+            # Repeating sessions are left out of the undo step; they are
+            # projected again from their rules straight after.
+            with self.history.paused():
+                if self._loader is not None:
+                    for _ in self._loader:
+                        pass
+                    self._loader = None
+                with self.schedule.transaction():
+                    for sid in self.schedule.projected():
+                        self.schedule.remove(sid)
+            self.schedule.clear()
+            self.reproject()
 
-def main():
+def run_headless(args):
+    schedule = Schedule()
+    if args.db:
+        store = ScheduleStore(args.db)
+        store.attach(schedule)
+        store.load_window(schedule, *day_window())
+        for _ in store.load_remaining(schedule, *day_window()):
+            pass
+        recurrences = RecurrenceSet()
+        for rid, data in store.load_rules():
+            recurrences.add(RecurrenceRule.from_dict(data, rid))
+        start = day_window()[0]
+        recurrences.project(schedule, start, start + timedelta(days=PROJECTION_DAYS))
+    
+    if args.plan:
+        from planner import read_tasks
+        
+        with open(args.plan, newline="", encoding="utf-8") as stream:
+            tasks = read_tasks(stream)
+        now = datetime.now()
+        windows = availability(now.date(), args.days, parse_hours(args.hours))
+        result, sids = plan_into(schedule, tasks, windows, after=now,
+                                 exhaustive=args.exhaustive)
+        print(f"{args.plan}: planned {len(sids)} sessions")
+        for task, minutes in result.unplaced:
+            print(f"  {task}: {minutes} min did not fit")
+        for task, minutes in result.late:
+            print(f"  {task}: {minutes} min past its deadline")
+    
+    for path in args.imports:
+        report = import_file(schedule, path)
+        print(f"{path}: imported {report.added}, skipped {report.skipped}")
+        for line, reason in report.errors[:10]:
+            print(f"  line {line}: {reason}")
+    
+    if args.report:
+        from analytics import SessionArrays, summarize
+        
+        print(f"Sessions: {len(schedule)}")
+        for category, minutes in sorted(schedule.category_totals().items()):
+            print(f"  {category}: {minutes} min")
+        for key, value in summarize(SessionArrays.from_schedule(schedule)).items():
+            print(f"{key}: {value}")
+    
+    if args.export:
+        export_file(schedule, args.export)
+    
+    if args.chart:
+        from chart_export import export_chart
+        
+        export_chart(schedule, args.chart, args.since, args.until)
+    
+    if args.db:
+        store.close()
+    
+    if metrics.registry.enabled:
+        print(metrics.registry.report())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pastel Student Scheduler")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window (implied when Tk is unavailable)")
+    parser.add_argument("--db", default=None,
+                        help=f"schedule database (GUI default: {DEFAULT_PATH})")
+    parser.add_argument("--import", dest="imports", action="append", default=[],
+                        metavar="FILE", help="CSV or .ics file to import (headless)")
+    parser.add_argument("--export", metavar="FILE", help="write the schedule as CSV or .ics (headless)")
+    parser.add_argument("--report", action="store_true", help="print study statistics (headless)")
+    parser.add_argument("--plan", metavar="FILE",
+                        help="CSV of tasks (task, duration, priority, deadline) to auto-schedule (headless)")
+    parser.add_argument("--hours", default=DEFAULT_HOURS, help="daily study hours for --plan")
+    parser.add_argument("--days", type=int, default=PLAN_DAYS, help="days ahead for --plan")
+    parser.add_argument("--exhaustive", action="store_true",
+                        help="search every task order for --plan (small task lists only)")
+    parser.add_argument("--chart", metavar="FILE",
+                        help="render the pie and Gantt charts to .png, .svg or .pdf (headless)")
+    parser.add_argument("--from", dest="since", type=datetime.fromisoformat, metavar="DATE",
+                        help="first day shown by --chart, YYYY-MM-DD")
+    parser.add_argument("--to", dest="until", type=datetime.fromisoformat, metavar="DATE",
+                        help="day after the last one shown by --chart, YYYY-MM-DD")
+    parser.add_argument("--metrics", action="store_true",
+                        help="time refresh and redraw stages and print a report on exit")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.registry.enable()
+    
+    if args.headless or tk is None:
+        run_headless(args)
+        return
+    
     root = tk.Tk()
-    app = PastelStudentScheduler(root)
+    app = PastelStudentScheduler(root, args.db or DEFAULT_PATH)
     root.mainloop()
 
 if __name__ == "__main__":
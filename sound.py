@@ -0,0 +1,32 @@
+# Alarm sound backends. winsound only exists on Windows, so the backend is
+# picked at runtime and falls back to the Tk bell or to silence.
+
+
+class SilentSound:
+    def play(self):
+        pass
+
+
+class TkBellSound:
+    def __init__(self, widget):
+        self.widget = widget
+
+    def play(self):
+        self.widget.bell()
+
+
+class WinsoundSound:
+    def __init__(self, winsound):
+        self.winsound = winsound
+
+    def play(self):
+        self.winsound.PlaySound("SystemExclamation",
+                                self.winsound.SND_ALIAS | self.winsound.SND_ASYNC)
+
+
+def detect(widget=None):
+    try:
+        import winsound
+    except ImportError:
+        return TkBellSound(widget) if widget is not None else SilentSound()
+    return WinsoundSound(winsound)
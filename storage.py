@@ -0,0 +1,251 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from schedule_core import to_minutes
+
+# SQLite in WAL mode. Schedule changes are queued and applied by one writer
+# thread in batched transactions, so saving never blocks the UI thread;
+# reads use their own connection and page through the data lazily.
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".pastel_scheduler.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    task TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_start ON sessions (start);
+CREATE TABLE IF NOT EXISTS timers (
+    label TEXT NOT NULL,
+    duration REAL NOT NULL,
+    deadline REAL,
+    remaining REAL
+);
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+_STOP = object()
+RETRIES = 3             # attempts per operation when the database is busy
+
+
+def _connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ScheduleStore:
+    def __init__(self, path=DEFAULT_PATH, batch_size=1000, on_error=None):
+        self.path = path
+        self.batch_size = batch_size
+        # Called from the writer thread as on_error(exc, op) for each
+        # change that could not be saved; defaults to a line on stderr.
+        self.on_error = on_error
+        self.last_error = None
+        self.failures = 0
+        self._muted = False
+        self._loaded_through = -1
+        self._queue = queue.SimpleQueue()
+
+        self._reader = _connect(path)
+        self._reader.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def attach(self, schedule):
+        self.schedule = schedule
+        schedule.subscribe(self._record)
+
+    def _record(self, changes):
+        if self._muted:
+            return
+        schedule = self.schedule
+        for op, sid in changes:
+            if op == 'add':
+                # Occurrences of recurring rules are regenerated from the
+                # rule on load, so only the rule itself is stored.
+                if schedule.rule_of(sid) is not None:
+                    continue
+                self._queue.put(('add', self._row(schedule, sid)))
+            elif op == 'update':
+                if schedule.rule_of(sid) is None:
+                    self._queue.put(('add', self._row(schedule, sid)))
+            elif op == 'remove':
+                self._queue.put(('remove', sid))
+            elif op == 'clear':
+                self._queue.put(('clear', None))
+
+    def _row(self, schedule, sid):
+        session = schedule.get(sid)
+        return (sid, to_minutes(session.start), to_minutes(session.end),
+                session.task, session.priority, session.category)
+
+    def save_timers(self, timers, clock=time.monotonic):
+        # Deadlines are stored as wall-clock times so they survive a restart.
+        offset = time.time() - clock()
+        rows = [(timer.label, timer.duration,
+                 None if timer.remaining is not None else timer.deadline + offset,
+                 timer.remaining)
+                for timer in timers]
+        self._queue.put(('timers', rows))
+
+    def save_rule(self, rule):
+        self._queue.put(('rule', (rule.id, json.dumps(rule.to_dict()))))
+
+    def delete_rule(self, rid):
+        self._queue.put(('delete_rule', rid))
+
+    def flush(self):
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait()
+
+    def close(self):
+        self._queue.put((_STOP, None))
+        self._writer.join()
+        self._reader.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._reader.close()
+
+    def _run(self):
+        conn = _connect(self.path)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiting = []
+            work = []
+            for op, payload in batch:
+                if op == 'flush':
+                    waiting.append(payload)
+                elif op is _STOP:
+                    running = False
+                else:
+                    work.append((op, payload))
+            try:
+                with conn:
+                    for op, payload in work:
+                        self._apply(conn, op, payload)
+            except sqlite3.Error:
+                # One bad change must not cost the rest of the batch: apply
+                # them one at a time, retrying busy errors, and report and
+                # skip only the ones that still fail.
+                for op, payload in work:
+                    self._apply_alone(conn, op, payload)
+            for done in waiting:
+                done.set()
+        conn.close()
+
+    def _apply(self, conn, op, payload):
+        if op == 'add':
+            conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", payload)
+        elif op == 'remove':
+            conn.execute("DELETE FROM sessions WHERE id = ?", (payload,))
+        elif op == 'clear':
+            conn.execute("DELETE FROM sessions")
+        elif op == 'timers':
+            conn.execute("DELETE FROM timers")
+            conn.executemany("INSERT INTO timers VALUES (?, ?, ?, ?)", payload)
+        elif op == 'rule':
+            conn.execute("INSERT OR REPLACE INTO rules VALUES (?, ?)", payload)
+        elif op == 'delete_rule':
+            conn.execute("DELETE FROM rules WHERE id = ?", (payload,))
+
+    def _apply_alone(self, conn, op, payload):
+        for attempt in range(1, RETRIES + 1):
+            try:
+                with conn:
+                    self._apply(conn, op, payload)
+                return
+            except sqlite3.OperationalError as exc:
+                # Usually a lock held by another connection
+                error = exc
+                time.sleep(0.05 * attempt)
+            except sqlite3.Error as exc:
+                error = exc
+                break
+        self.last_error = error
+        self.failures += 1
+        if self.on_error is not None:
+            self.on_error(error, op)
+        else:
+            print(f"{self.path}: could not save {op}: {error}", file=sys.stderr)
+
+    def max_id(self):
+        row = self._reader.execute("SELECT MAX(id) FROM sessions").fetchone()
+        return -1 if row[0] is None else row[0]
+
+    def count(self):
+        return self._reader.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def load_window(self, schedule, start, end):
+        # Restores only sessions starting in [start, end) and reserves the
+        # id range of everything else, so new sessions cannot collide with
+        # rows loaded later by load_remaining().
+        self._loaded_through = self.max_id()
+        schedule.reserve(self._loaded_through + 1)
+        rows = self._reader.execute(
+            "SELECT id, start, end, task, priority, category FROM sessions "
+            "WHERE start >= ? AND start < ? ORDER BY start",
+            (to_minutes(start), to_minutes(end)))
+        self._muted = True
+        try:
+            return schedule.restore(rows)
+        finally:
+            self._muted = False
+
+    def load_remaining(self, schedule, start, end, chunk_size=5000):
+        # Generator restoring everything outside [start, end) one chunk per
+        # step, so the caller can spread the work over idle callbacks. Only
+        # rows that predate load_window() are read: later ones were made in
+        # this run and are either in the schedule or were removed from it.
+        low, high = to_minutes(start), to_minutes(end)
+        through = self._loaded_through
+        last_id = -1
+        while True:
+            rows = self._reader.execute(
+                "SELECT id, start, end, task, priority, category FROM sessions "
+                "WHERE id > ? AND id <= ? AND (start < ? OR start >= ?) ORDER BY id LIMIT ?",
+                (last_id, through, low, high, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            self._muted = True
+            try:
+                schedule.restore(row for row in rows if row[0] not in schedule)
+            finally:
+                self._muted = False
+            yield len(rows)
+
+    def load_timers(self):
+        return self._reader.execute(
+            "SELECT label, duration, deadline, remaining FROM timers").fetchall()
+
+    def load_rules(self):
+        # (id, dict) pairs; RecurrenceRule.from_dict turns them back into rules.
+        return [(rid, json.loads(data)) for rid, data in
+                self._reader.execute("SELECT id, data FROM rules ORDER BY id")]
+
+
+def day_window(moment=None):
+    moment = moment or datetime.now()
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=1)
@@ -0,0 +1,125 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics import (SessionArrays, break_ratio, daily_minutes, focus_streaks,  # noqa: E402
+                       hour_heatmap, minutes_by_subject, priority_compliance, summarize)
+from schedule_core import Schedule, from_minutes, to_minutes  # noqa: E402
+
+PRIORITY_LEVEL = {"High": 0, "Medium": 1, "Low": 2}
+
+
+def random_rows(seed, count=300, base=datetime(2025, 1, 6)):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        start = to_minutes(base) + rng.randrange(-20000, 40000)
+        length = rng.choice((15, 30, 90, 300, 1500, 11000))
+        rows.append((start, start + length, rng.choice(("Maths", "Chem", "Art")),
+                     rng.choice(("High", "Medium", "Low")),
+                     rng.choice(("Study", "Study", "Water Break", "Food Break"))))
+    return rows
+
+
+def test_from_schedule_matches_from_rows():
+    schedule = Schedule()
+    for start, end, task, priority, category in random_rows(1, 50):
+        schedule.add(from_minutes(start), end - start, task, priority, category)
+    schedule.remove(schedule.ids()[3])
+    direct = SessionArrays.from_schedule(schedule)
+    rows = SessionArrays.from_rows(schedule.rows())
+    assert len(direct) == len(rows) == 49
+    assert (direct.start == rows.start).all() and (direct.end == rows.end).all()
+    assert [direct.tasks[code] for code in direct.task] == [rows.tasks[code] for code in rows.task]
+
+
+def test_hour_heatmap_matches_minute_by_minute_count():
+    rows = random_rows(2)
+    expected = np.zeros((7, 24))
+    for start, end, *_ in rows:
+        for minute in range(start, end):
+            moment = from_minutes(minute)
+            expected[moment.weekday(), moment.hour] += 1
+    assert (hour_heatmap(SessionArrays.from_rows(rows)) == expected).all()
+
+
+def test_hour_heatmap_filters_categories():
+    rows = [(to_minutes(datetime(2025, 1, 12, 23, 30)), to_minutes(datetime(2025, 1, 13, 0, 30)),
+             "Maths", "High", "Study"),
+            (to_minutes(datetime(2025, 1, 7, 9)), to_minutes(datetime(2025, 1, 7, 9, 15)),
+             "Water", "Low", "Water Break")]
+    heatmap = hour_heatmap(SessionArrays.from_rows(rows), ("Study",))
+    assert heatmap[6, 23] == 30 and heatmap[0, 0] == 30
+    assert heatmap.sum() == 60
+
+
+def test_priority_compliance_matches_brute_force():
+    rows = random_rows(3)
+    by_day = defaultdict(list)
+    for start, _, _, priority, _ in sorted(rows, key=lambda row: row[0]):
+        by_day[from_minutes(start).date()].append(PRIORITY_LEVEL[priority])
+    flags = {}
+    for day, levels in by_day.items():
+        flags[day] = [all(earlier <= level for earlier in levels[:index])
+                      for index, level in enumerate(levels)]
+
+    days, daily, overall = priority_compliance(SessionArrays.from_rows(rows))
+    for day, share in zip(days.astype(object), daily):
+        if day in flags:
+            assert share == pytest.approx(sum(flags[day]) / len(flags[day]))
+        else:
+            assert np.isnan(share)
+    every = [flag for day_flags in flags.values() for flag in day_flags]
+    assert overall == pytest.approx(sum(every) / len(every))
+
+
+def test_priority_compliance_just_before_the_epoch():
+    # Day -1 must not be compared with the sentinel that precedes the data.
+    rows = [(-60, -30, "Maths", "High", "Study")]
+    assert priority_compliance(SessionArrays.from_rows(rows))[2] == 1.0
+
+
+def test_daily_minutes_and_streaks():
+    day = to_minutes(datetime(2025, 1, 6))
+    rows = [(day + 1440 * offset + 600, day + 1440 * offset + 600 + minutes, "Maths", "High", "Study")
+            for offset, minutes in ((0, 90), (1, 30), (2, 60), (3, 120), (5, 75))]
+    rows.append((day + 700, day + 715, "Water", "Low", "Water Break"))
+    data = SessionArrays.from_rows(rows)
+
+    days, minutes = daily_minutes(data)
+    assert list(days.astype(object)) == [datetime(2025, 1, 6).date() + timedelta(days=offset)
+                                         for offset in range(6)]
+    assert list(minutes) == [90, 30, 60, 120, 0, 75]
+    _, streak, longest = focus_streaks(data, 60)
+    assert list(streak) == [1, 0, 1, 2, 0, 1]
+    assert longest == 2
+
+    _, ratio, overall = break_ratio(data)
+    assert ratio[0] == pytest.approx(15 / 90)
+    assert overall == pytest.approx(15 / 375)
+
+
+def test_minutes_by_subject_by_week():
+    rows = random_rows(4)
+    starts, subjects, table = minutes_by_subject(SessionArrays.from_rows(rows), 'week')
+    assert all(day.weekday() == 0 for day in starts.astype(object))
+    expected = defaultdict(int)
+    for start, end, task, *_ in rows:
+        moment = from_minutes(start)
+        expected[(moment - timedelta(days=moment.weekday())).date(), task] += end - start
+    for row, week in enumerate(starts.astype(object)):
+        for column, task in enumerate(subjects):
+            assert table[row, column] == expected.get((week, task), 0)
+    with pytest.raises(ValueError):
+        minutes_by_subject(SessionArrays.from_rows(rows), 'month')
+
+
+def test_summarize_empty_history():
+    summary = summarize(SessionArrays.from_rows([]))
+    assert summary['sessions'] == 0
+    assert summary['busiest_hour'] is None
+    assert summary['priority_compliance'] == 1.0
@@ -0,0 +1,200 @@
+import asyncio
+import http.client
+import json
+import threading
+
+import pytest
+
+from api_server import ScheduleServer
+from schedule_core import Schedule
+
+
+@pytest.fixture
+def server():
+    # The server runs on its own event loop thread; tests talk to it over
+    # real sockets with http.client, as a kiosk would.
+    loop = asyncio.new_event_loop()
+    app = ScheduleServer(Schedule())
+    started = threading.Event()
+    holder = {}
+
+    async def start():
+        holder['server'] = await app.start("127.0.0.1", 0)
+        started.set()
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(start(), loop)
+    assert started.wait(5)
+    app.port = holder['server'].sockets[0].getsockname()[1]
+    yield app
+
+    async def stop():
+        # Event streams stay open until cancelled
+        holder['server'].close()
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await holder['server'].wait_closed()
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def call(server, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        payload = body if isinstance(body, (bytes, type(None))) else json.dumps(body)
+        conn.request(method, path, payload, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        conn.close()
+
+
+def test_sessions_round_trip(server):
+    status, first = call(server, "POST", "/sessions",
+                         {"task": "Maths", "duration": 60, "start": "2025-01-06T09:00"})
+    assert status == 201
+    assert first["start"] == "2025-01-06T09:00" and first["end"] == "2025-01-06T10:00"
+
+    status, second = call(server, "POST", "/sessions", {"task": "Physics", "duration": 30,
+                                                        "priority": "High"})
+    assert status == 201 and second["start"] == "2025-01-06T10:00"
+
+    status, listing = call(server, "GET", "/sessions")
+    assert status == 200 and listing["total"] == 2
+    assert [session["task"] for session in listing["sessions"]] == ["Maths", "Physics"]
+
+    status, window = call(server, "GET", "/sessions?from=2025-01-06T09:30&limit=1")
+    assert window["total"] == 1 and window["sessions"][0]["task"] == "Physics"
+
+    assert call(server, "GET", f"/sessions/{first['id']}") == (200, first)
+    status, removed = call(server, "DELETE", f"/sessions/{first['id']}")
+    assert status == 200 and removed["task"] == "Maths"
+    assert call(server, "GET", "/sessions")[1]["total"] == 1
+
+
+def test_overlap_is_a_conflict_with_a_suggestion(server):
+    call(server, "POST", "/sessions", {"task": "Maths", "duration": 60, "start": "2025-01-06T09:00"})
+    status, body = call(server, "POST", "/sessions",
+                        {"task": "Physics", "duration": 30, "start": "2025-01-06T09:30"})
+    assert status == 409
+    assert [session["task"] for session in body["conflicts"]] == ["Maths"]
+    assert body["suggested_start"] == "2025-01-06T10:00"
+
+    status, _ = call(server, "POST", "/sessions", {"task": "Physics", "duration": 30,
+                                                  "start": "2025-01-06T09:30",
+                                                  "allow_overlap": True})
+    assert status == 201
+
+
+@pytest.mark.parametrize("body", [
+    {"duration": 30},
+    {"task": "Maths", "duration": 0},
+    {"task": "Maths", "duration": "soon"},
+    {"task": "Maths", "duration": 5000000000},
+    {"task": "Maths", "duration": 30, "priority": "Urgent"},
+    {"task": "Maths", "duration": 30, "start": "tomorrow"},
+    {"task": "Maths", "duration": 30, "start": "9000-01-01T00:00"},
+    {"task": "Maths", "duration": 30, "category": ["Study"]},
+    {"task": "Maths", "duration": 30, "category": "x" * 500},
+    {"task": 7, "duration": 30},
+    b"not json",
+    b"[1, 2]",
+])
+def test_bad_sessions_are_rejected(server, body):
+    status, error = call(server, "POST", "/sessions", body)
+    assert status == 400 and error["error"]
+    assert call(server, "GET", "/sessions")[1]["total"] == 0
+
+
+def test_too_many_categories_is_a_client_error(server):
+    statuses = {call(server, "POST", "/sessions",
+                     {"task": "Maths", "duration": 5, "category": f"Category {number}"})[0]
+                for number in range(260)}
+    assert statuses == {201, 400}
+    listing = call(server, "GET", "/sessions?limit=1000")[1]
+    assert listing["total"] == len(listing["sessions"])
+
+
+def test_unknown_paths_and_ids(server):
+    assert call(server, "GET", "/nothing")[0] == 404
+    assert call(server, "GET", "/")[0] == 404
+    assert call(server, "DELETE", "/sessions/99")[0] == 404
+    assert call(server, "DELETE", "/sessions/abc")[0] == 404
+    assert call(server, "DELETE", "/timers/99")[0] == 404
+    assert call(server, "PUT", "/sessions")[0] == 405
+
+
+def test_gaps(server):
+    call(server, "POST", "/sessions", {"task": "Maths", "duration": 60, "start": "2025-01-06T09:00"})
+    status, body = call(server, "GET", "/gaps?duration=30&after=2025-01-06T09:15&count=2")
+    assert status == 200
+    assert body["gaps"] == [{"start": "2025-01-06T10:00", "end": "2025-01-06T10:30"},
+                            {"start": "2025-01-06T10:30", "end": "2025-01-06T11:00"}]
+    assert call(server, "GET", "/gaps")[0] == 400
+    assert call(server, "GET", "/gaps?duration=-5")[0] == 400
+    assert call(server, "GET", "/gaps?duration=0.5")[0] == 400
+    assert call(server, "GET", "/gaps?duration=soon")[0] == 400
+    assert call(server, "GET", "/gaps?duration=5000000000")[0] == 400
+
+
+def test_timers(server):
+    status, timer = call(server, "POST", "/timers", {"minutes": 25, "label": "Focus"})
+    assert status == 201 and timer["label"] == "Focus" and timer["state"] == "running"
+    assert [item["id"] for item in call(server, "GET", "/timers")[1]["timers"]] == [timer["id"]]
+    assert call(server, "POST", "/timers", {"seconds": -1})[0] == 400
+    assert call(server, "POST", "/timers", {})[0] == 400
+    assert call(server, "DELETE", f"/timers/{timer['id']}")[0] == 200
+    assert call(server, "GET", "/timers")[1]["timers"] == []
+
+
+@pytest.mark.parametrize("body", [
+    b'{"seconds": 1e400}',
+    b'{"seconds": NaN}',
+    b'{"minutes": Infinity}',
+    b'{"minutes": 1e307}',
+    {"seconds": 8 * 24 * 3600},
+    {"minutes": "soon"},
+])
+def test_bad_timers_are_rejected(server, body):
+    status, error = call(server, "POST", "/timers", body)
+    assert status == 400 and error["error"]
+    assert call(server, "GET", "/timers")[1]["timers"] == []
+
+
+def test_analytics(server):
+    pytest.importorskip("numpy")
+    call(server, "POST", "/sessions", {"task": "Maths", "duration": 60, "start": "2025-01-06T09:00"})
+    status, body = call(server, "GET", "/analytics?day=2025-01-06")
+    assert status == 200
+    assert body["day_minutes"] == 60
+    assert body["category_totals"] == {"Study": 60}
+
+
+def test_expired_timer_is_pushed_as_an_event_and_dismissed(server):
+    events = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    events.request("GET", "/events")
+    stream = events.getresponse()
+    assert stream.status == 200
+    assert stream.getheader("Content-Type") == "text/event-stream"
+
+    status, timer = call(server, "POST", "/timers", {"seconds": 0.05, "label": "Tea"})
+    assert status == 201
+    assert stream.readline() == b"event: timer\n"
+    event = json.loads(stream.readline().decode().removeprefix("data: "))
+    assert event == {"id": timer["id"], "label": "Tea", "duration": 0.05}
+    events.close()
+    assert call(server, "GET", "/timers")[1]["timers"] == []
+
+
+def test_server_errors_answer_with_500(server, monkeypatch):
+    def broken(rest, query, data):
+        raise RuntimeError("boom")
+    monkeypatch.setitem(server._routes, ("GET", "timers"), broken)
+    status, body = call(server, "GET", "/timers")
+    assert status == 500 and "RuntimeError" in body["error"]
+    assert call(server, "GET", "/sessions")[0] == 200
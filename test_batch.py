@@ -0,0 +1,62 @@
+import os
+from datetime import date
+
+import pytest
+
+from batch import read_students, run
+from planner import BreakRule, parse_hours
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_single_csv_groups_rows_by_student(tmp_path):
+    path = write(tmp_path / "class.csv", "student,task,duration\nBob,B,40\nAnn,A,30\nBob,C,20\n")
+    students = read_students(path)
+    assert [student for student, tasks in students] == ["Ann", "Bob"]
+    assert [task.task for task in students[1][1]] == ["B", "C"]
+
+
+@pytest.mark.parametrize("text", [
+    "task,duration\nA,30\n",                    # no student column
+    "student,task,duration\n ,A,30\n",          # blank student
+    "student,task,duration\n../x,A,30\n",       # leaves the output directory
+    "student,task,duration\na\\b,A,30\n",
+    "student,task,duration\nSummary,A,30\n",    # would overwrite summary.csv
+])
+def test_unusable_student_names_are_rejected(tmp_path, text):
+    with pytest.raises(ValueError):
+        read_students(write(tmp_path / "class.csv", text))
+
+
+def test_directory_cannot_hold_a_summary_student(tmp_path):
+    write(tmp_path / "ann.csv", "task,duration\nA,30\n")
+    write(tmp_path / "summary.csv", "task,duration\nB,30\n")
+    with pytest.raises(ValueError):
+        read_students(str(tmp_path))
+
+
+def test_output_does_not_depend_on_the_worker_count(tmp_path):
+    pytest.importorskip("numpy")
+    rows = ["student,task,duration,priority,deadline"]
+    for number in range(6):
+        for task in range(number % 4 + 1):
+            rows.append(f"S{number},Task {task},{30 + 25 * task},{('High', 'Low')[task % 2]},"
+                        f"2025-01-0{6 + task}")
+    rows.append("Broken,Task,soon,High,")
+    students = read_students(write(tmp_path / "class.csv", "\n".join(rows) + "\n"))
+    options = dict(start=date(2025, 1, 6), days=3, hours=parse_hours("09:00-12:00, 13:00-17:00"),
+                   rule=BreakRule(60, 10), exhaustive=3)
+
+    outputs = []
+    for workers in (1, 2):
+        output = tmp_path / f"workers-{workers}"
+        summaries = run(students, str(output), workers, **options)
+        assert [summary["student"] for summary in summaries] == ["Broken"] + [f"S{n}" for n in range(6)]
+        assert summaries[0]["error"] and not any(summary["error"] for summary in summaries[1:])
+        outputs.append({name: (output / name).read_text(encoding="utf-8")
+                        for name in sorted(os.listdir(output))})
+    assert sorted(outputs[0]) == [f"S{n}.csv" for n in range(6)] + ["summary.csv"]
+    assert outputs[0] == outputs[1]
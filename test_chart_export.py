@@ -0,0 +1,103 @@
+import os
+from datetime import datetime
+
+import pytest
+
+import chart_export
+from chart_export import ChartCache, content_hash, export_chart, export_many, select_rows
+from schedule_core import Schedule, to_minutes
+
+DAY = to_minutes(datetime(2025, 1, 6))
+ROWS = [(DAY + 540, DAY + 600, "Maths", "High", "Study"),
+        (DAY + 1410, DAY + 1500, "Late", "Low", "Study"),
+        (DAY + 1440 + 540, DAY + 1440 + 570, "Water", "High", "Water Break")]
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    # Stands in for matplotlib: the "image" names the rows it was drawn from.
+    calls = []
+
+    def render(rows, fmt="png", size=(8, 3), dpi=100):
+        calls.append(rows)
+        return f"{fmt}:{[row[2] for row in rows]}".encode()
+
+    monkeypatch.setattr(chart_export, "render_rows", render)
+    return calls
+
+
+def test_select_rows_keeps_rows_overlapping_the_range():
+    def tasks(start, end):
+        return [row[2] for row in select_rows(ROWS, start, end)]
+
+    assert tasks(None, None) == ["Maths", "Late", "Water"]
+    assert tasks(datetime(2025, 1, 7), None) == ["Late", "Water"]
+    assert tasks(datetime(2025, 1, 7, 1), None) == ["Water"]
+    assert tasks(None, datetime(2025, 1, 6, 9)) == []
+    assert tasks(None, datetime(2025, 1, 6, 9, 1)) == ["Maths"]
+    assert tasks(datetime(2025, 1, 6, 10), datetime(2025, 1, 6, 23, 30)) == []
+    assert tasks(datetime(2025, 1, 6, 10), datetime(2025, 1, 6, 23, 31)) == ["Late"]
+
+
+def test_content_hash_covers_rows_and_settings():
+    base = content_hash(ROWS)
+    assert content_hash(list(ROWS)) == base
+    assert content_hash(ROWS[:2]) != base
+    assert content_hash([ROWS[0][:2] + ("Physics",) + ROWS[0][3:]] + ROWS[1:]) != base
+    assert content_hash([ROWS[0][:3] + ("Low",) + ROWS[0][4:]] + ROWS[1:]) != base
+    assert content_hash([ROWS[0][:4] + ("Food Break",)] + ROWS[1:]) != base
+    assert content_hash([(ROWS[0][0], ROWS[0][1] + 1) + ROWS[0][2:]] + ROWS[1:]) != base
+    assert len({base, content_hash(ROWS, "svg"), content_hash(ROWS, size=(6, 3)),
+                content_hash(ROWS, dpi=200)}) == 4
+
+
+def test_cache_evicts_the_least_recently_used(renders):
+    cache = ChartCache(max_items=2)
+    first, second, third = ROWS[:1], ROWS[:2], ROWS
+    cache.render(first)
+    cache.render(second)
+    assert cache.render(first) == b"png:['Maths']"
+    cache.render(third)                 # evicts second, the least recently used
+    cache.render(first)
+    assert (cache.hits, cache.misses) == (2, 3)
+    cache.render(second)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert renders == [first, second, third, second]
+
+
+def test_cache_directory_is_shared_between_caches(renders, tmp_path):
+    ChartCache(str(tmp_path)).render(ROWS, "svg")
+    other = ChartCache(str(tmp_path))
+    assert other.render(ROWS, "svg") == b"svg:['Maths', 'Late', 'Water']"
+    assert (other.hits, other.misses) == (1, 0)
+    assert len(renders) == 1
+    assert os.listdir(tmp_path) == [f"{content_hash(ROWS, 'svg')}.svg"]
+
+
+def test_failed_write_leaves_no_file_under_the_final_name(tmp_path):
+    cache = ChartCache(str(tmp_path))
+    key = content_hash(ROWS)
+    with pytest.raises(TypeError):
+        cache._write(key, "png", "not bytes")
+    assert not os.path.exists(tmp_path / f"{key}.png")
+    assert cache._read(key, "png") is None
+
+    cache._write(key, "png", b"image")
+    assert cache._read(key, "png") == b"image"
+    assert [name for name in os.listdir(tmp_path) if not name.endswith(".tmp")] == [f"{key}.png"]
+
+
+def test_export_chart_and_export_many(renders, tmp_path):
+    schedule = Schedule()
+    schedule.add(datetime(2025, 1, 6, 9), 60, "Maths")
+    schedule.add(datetime(2025, 1, 8, 9), 60, "Physics")
+    path = str(tmp_path / "week.svg")
+    export_chart(schedule, path, datetime(2025, 1, 7), cache=ChartCache())
+    with open(path, "rb") as stream:
+        assert stream.read() == b"svg:['Physics']"
+
+    paths = export_many([(ROWS, str(tmp_path / "a.png")), (ROWS[:1], str(tmp_path / "b.pdf"))],
+                        workers=1, cache_dir=str(tmp_path / "cache"))
+    assert [os.path.basename(path) for path in paths] == ["a.png", "b.pdf"]
+    with open(paths[1], "rb") as stream:
+        assert stream.read() == b"pdf:['Maths']"
@@ -0,0 +1,118 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks import FakeTree
+from history import History
+from schedule_core import Schedule
+from schedule_table import ScheduleTable
+
+BASE = datetime(2025, 1, 6)
+PAGE = 5
+
+
+def state(schedule):
+    return (list(schedule.rows()), schedule.ids(), schedule.category_totals(),
+            schedule.priority_totals(), schedule.day_total(BASE.date()))
+
+
+def random_change(rng, schedule):
+    choice = rng.random()
+    if choice < 0.35 or not len(schedule):
+        schedule.add(BASE + timedelta(minutes=rng.randrange(3000)), rng.choice((10, 30, 90)),
+                     rng.choice("abc"), rng.choice(("High", "Low")),
+                     rng.choice(("Study", "Food Break")))
+    elif choice < 0.55:
+        schedule.remove(rng.choice(schedule.ids()))
+    elif choice < 0.7:
+        schedule.move(rng.choice(schedule.ids()), BASE + timedelta(minutes=rng.randrange(3000)))
+    elif choice < 0.85:
+        schedule.update(rng.choice(schedule.ids()), duration=rng.choice((15, 45)),
+                        task=rng.choice("xyz"))
+    elif choice < 0.9:
+        schedule.clear()
+    else:
+        schedule.add_many([(BASE + timedelta(minutes=rng.randrange(3000)), 20, "m", "Medium",
+                            "Study") for _ in range(rng.randrange(1, 9))])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_undo_and_redo_replay_recorded_states(seed):
+    rng = random.Random(seed)
+    schedule = Schedule()
+    tree = FakeTree()
+    table = ScheduleTable(tree, schedule, page_size=PAGE)
+    history = History(schedule)
+    states, undone = [state(schedule)], []
+
+    for step in range(300):
+        choice = rng.random()
+        if choice < 0.2:
+            if history.undo():
+                undone.append(states.pop())
+        elif choice < 0.3:
+            if history.redo():
+                states.append(undone.pop())
+        else:
+            random_change(rng, schedule)
+            states.append(state(schedule))
+            undone.clear()
+            if rng.random() < 0.1:
+                table.next_page()
+            elif rng.random() < 0.05:
+                table.prev_page()
+        assert state(schedule) == states[-1]
+        assert history.can_undo() == (len(states) > 1)
+        assert history.can_redo() == bool(undone)
+        # The table follows the incremental changes
+        page = [str(sid) for sid in schedule.ids()[table.offset:table.offset + PAGE]]
+        assert tree.get_children() == tuple(page)
+
+
+def test_paused_changes_are_not_recorded():
+    schedule = Schedule()
+    history = History(schedule)
+    with history.paused():
+        schedule.add(BASE, 30, "Loaded")
+    assert not history.can_undo()
+    sid = schedule.add(BASE + timedelta(hours=1), 30, "Typed")
+    assert history.undo()
+    assert sid not in schedule and len(schedule) == 1
+    assert history.undo() is None
+
+
+def test_new_change_discards_redo():
+    schedule = Schedule()
+    history = History(schedule)
+    schedule.add(BASE, 30, "First")
+    history.undo()
+    assert history.can_redo()
+    schedule.add(BASE, 30, "Second")
+    assert not history.can_redo()
+
+
+def test_limit_drops_oldest_steps():
+    schedule = Schedule()
+    history = History(schedule, limit=3)
+    for hour in range(5):
+        schedule.add(BASE + timedelta(hours=hour), 30, f"Task {hour}")
+    while history.undo():
+        pass
+    assert [session.task for session in schedule.sessions()] == ["Task 0", "Task 1"]
+
+
+def test_undo_keeps_ids_and_listeners_see_net_changes():
+    schedule = Schedule()
+    history = History(schedule)
+    sid = schedule.add(BASE, 30, "Maths")
+    schedule.move(sid, BASE + timedelta(hours=2))
+    heard = []
+    schedule.subscribe(heard.append)
+    history.undo()
+    assert heard == [[('update', sid)]]
+    assert schedule.get(sid).start == BASE
+    history.undo()
+    assert heard[-1] == [('remove', sid)]
+    history.redo()
+    assert heard[-1] == [('add', sid)] and schedule.get(sid).start == BASE
@@ -0,0 +1,97 @@
+import random
+import time
+
+import pytest
+
+from interval_index import IntervalIndex
+
+
+def in_order(interval):
+    begin, finish, sid = interval
+    return begin, sid
+
+
+def brute_overlapping(intervals, start, end):
+    return [sid for begin, finish, sid in sorted(intervals.values(), key=in_order)
+            if begin < end and finish > start]
+
+
+def brute_find_gap(intervals, after, length):
+    moment = after
+    for begin, finish, sid in sorted(intervals.values(), key=in_order):
+        if begin - moment >= length:
+            return moment
+        moment = max(moment, finish)
+    return moment
+
+
+def random_index(rng, count, horizon, longest):
+    index = IntervalIndex(seed=rng.random())
+    intervals = {}
+    for sid in range(count):
+        begin = rng.randrange(horizon)
+        finish = begin + rng.randint(1, longest)
+        index.insert(begin, finish, sid)
+        intervals[sid] = (begin, finish, sid)
+    return index, intervals
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_queries_match_brute_force(seed):
+    rng = random.Random(seed)
+    index, intervals = random_index(rng, rng.randint(0, 300), 5000, rng.choice((5, 60, 2000)))
+    for step in range(400):
+        if intervals and rng.random() < 0.3:
+            begin, finish, sid = intervals.pop(rng.choice(list(intervals)))
+            index.remove(begin, sid)
+        elif rng.random() < 0.3:
+            sid = max(intervals, default=-1) + 1
+            begin = rng.randrange(5000)
+            finish = begin + rng.randint(1, 200)
+            index.insert(begin, finish, sid)
+            intervals[sid] = (begin, finish, sid)
+
+        start = rng.randrange(-100, 5200)
+        end = start + rng.randint(1, 300)
+        length = rng.randint(1, 120)
+        assert len(index) == len(intervals)
+        assert index.overlapping(start, end) == brute_overlapping(intervals, start, end)
+        assert index.find_gap(start, length) == brute_find_gap(intervals, start, length)
+        expected_end = max((finish for _, finish, _ in intervals.values()), default=None)
+        assert index.max_end() == expected_end
+
+        ordered = [sid for _, _, sid in sorted(intervals.values(), key=in_order)]
+        offset = rng.randrange(len(ordered) + 2)
+        assert list(index.ids(offset)) == ordered[offset:]
+        if ordered:
+            position = rng.randrange(len(ordered))
+            begin, _, sid = intervals[ordered[position]]
+            assert index.select(position) == sid
+            assert index.rank(begin, sid) == position
+        assert index.rank(start) == sum(begin < start for begin, _, _ in intervals.values())
+
+
+def test_find_gap_with_one_interval_covering_the_rest():
+    index = IntervalIndex(seed=1)
+    index.insert(0, 10000, 0)
+    for sid in range(1, 200):
+        index.insert(sid * 40, sid * 40 + 10, sid)
+    assert index.find_gap(0, 20) == 10000
+    index.remove(0, 0)
+    assert index.find_gap(0, 20) == 0
+    assert index.find_gap(45, 30) == 50
+    assert index.find_gap(45, 31) == 199 * 40 + 10
+
+
+def test_find_gap_skips_short_gaps_quickly():
+    # 50k back-to-back 30 minute sessions with 5 minute gaps: a 10 minute
+    # gap only exists after the last one, and finding it must not step
+    # through every block.
+    index = IntervalIndex(seed=2)
+    for sid in range(50000):
+        index.insert(sid * 35, sid * 35 + 30, sid)
+    began = time.perf_counter()
+    for _ in range(100):
+        assert index.find_gap(0, 10) == 49999 * 35 + 30
+    assert (time.perf_counter() - began) / 100 < 0.005
+    assert index.find_gap(0, 5) == 30
@@ -0,0 +1,96 @@
+import random
+from datetime import date, datetime
+
+import pytest
+
+from planner import (EXHAUSTIVE_LIMIT, BreakRule, PlanTask, availability, free_time,
+                     parse_hours, plan, plan_into)
+from schedule_core import Schedule, to_minutes
+
+
+def test_focus_limit_below_min_chunk_still_places_work():
+    result = plan([PlanTask("A", 120)], [(0, 600)], BreakRule(max_focus=20, length=10))
+    assert result.unplaced == []
+    work = [(begin, end) for begin, end, task, *_ in result.sessions if task == "A"]
+    breaks = [session for session in result.sessions if session[2] == "Water Break"]
+    assert sum(end - begin for begin, end in work) == 120
+    assert all(end - begin <= 20 for begin, end in work)
+    assert len(breaks) == len(work) - 1
+
+
+def test_breaks_split_long_focus():
+    result = plan([PlanTask("A", 180)], [(0, 600)], BreakRule(max_focus=90, length=10))
+    assert [(begin, end, task) for begin, end, task, *_ in result.sessions] == [
+        (0, 90, "A"), (90, 100, "Water Break"), (100, 190, "A")]
+
+
+def order_of(result):
+    seen = []
+    for _, _, task, *_ in result.sessions:
+        if task != "Water Break" and task not in seen:
+            seen.append(task)
+    return seen
+
+
+def test_earliest_deadline_goes_first_and_priority_breaks_ties():
+    tasks = [PlanTask("Essay", 60, "High", datetime(2025, 1, 8)),
+             PlanTask("Quiz", 30, "Low", datetime(2025, 1, 6, 12)),
+             PlanTask("Reading", 30, "Low"),
+             PlanTask("Maths", 30, "High"),
+             PlanTask("Lab", 30, "Medium", datetime(2025, 1, 8))]
+    day = to_minutes(datetime(2025, 1, 6))
+    result = plan(tasks, [(day + 540, day + 1080)])
+    assert order_of(result) == ["Quiz", "Essay", "Lab", "Maths", "Reading"]
+    assert result.unplaced == [] and result.late == []
+
+
+def test_missed_deadlines_and_leftover_work_are_reported():
+    day = to_minutes(datetime(2025, 1, 6))
+    tasks = [PlanTask("Quiz", 60, "High", datetime(2025, 1, 6, 9, 30)),
+             PlanTask("Essay", 200, "Low")]
+    result = plan(tasks, [(day + 540, day + 720)], BreakRule(max_focus=600))
+    assert result.late == [("Quiz", 30)]
+    assert result.unplaced == [("Essay", 80)]
+    assert result.cost[:2] == (80, 90)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_exhaustive_is_never_worse_than_the_heuristic(seed):
+    rng = random.Random(seed)
+    day = to_minutes(datetime(2025, 1, 6))
+    tasks = [PlanTask(f"T{number}", rng.choice((20, 45, 90, 150)),
+                      rng.choice(("High", "Medium", "Low")),
+                      rng.choice((None, datetime(2025, 1, 6, rng.randrange(10, 20)))))
+             for number in range(rng.randint(1, 5))]
+    free = [(day + 540, day + 720), (day + 780, day + 900)]
+    heuristic = plan(tasks, free)
+    best = plan(tasks, free, exhaustive=True)
+    assert best.cost <= heuristic.cost
+    placed = sum(end - begin for begin, end, task, *_ in best.sessions if task != "Water Break")
+    assert placed + sum(minutes for _, minutes in best.unplaced) == sum(t.duration for t in tasks)
+
+
+def test_exhaustive_planning_is_limited():
+    tasks = [PlanTask(f"T{number}", 30) for number in range(EXHAUSTIVE_LIMIT + 1)]
+    with pytest.raises(ValueError):
+        plan(tasks, [(0, 600)], exhaustive=True)
+    assert len(plan(tasks, [(0, 600)]).sessions) >= len(tasks)
+
+
+def test_free_time_leaves_out_sessions_and_the_past():
+    schedule = Schedule()
+    schedule.add(datetime(2025, 1, 6, 10), 60, "Lecture")
+    schedule.add(datetime(2025, 1, 6, 16, 30), 60, "Sport")
+    windows = availability(date(2025, 1, 6), 2, parse_hours("09:00-12:00, 13:00-17:00"))
+    free = free_time(windows, schedule, after=datetime(2025, 1, 6, 9, 15))
+    day = to_minutes(datetime(2025, 1, 6))
+    assert free == [(day + 555, day + 600), (day + 660, day + 720), (day + 780, day + 990),
+                    (day + 1440 + 540, day + 1440 + 720), (day + 1440 + 780, day + 1440 + 1020)]
+
+    result, sids = plan_into(schedule, [PlanTask("Essay", 100)], windows,
+                             after=datetime(2025, 1, 6, 9, 15))
+    assert result.unplaced == []
+    added = [schedule.get(sid) for sid in sids]
+    assert all(session.start >= datetime(2025, 1, 6, 9, 15) for session in added)
+    assert all(not [other for other in schedule.conflicts(session.start, session.duration)
+                    if other.id != session.id] for session in added)
@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from history import History
+from recurrence import RecurrenceRule, RecurrenceSet, parse_weekdays
+from schedule_core import Schedule, from_minutes, to_minutes
+
+MON_WED_FRI = parse_weekdays("Mon Wed Fri")
+
+
+def days(rule, start, end):
+    rows = rule.occurrences(to_minutes(start), to_minutes(end))
+    return [from_minutes(begin) for begin, *_ in rows]
+
+
+def test_parse_weekdays():
+    assert MON_WED_FRI == 0b10101
+    assert parse_weekdays("sun,saturday") == 0b1100000
+    with pytest.raises(ValueError):
+        parse_weekdays("Mon Funday")
+    with pytest.raises(ValueError):
+        parse_weekdays(" , ")
+
+
+@pytest.mark.parametrize("first", [date(1969, 12, 1), date(1970, 1, 1), date(2025, 1, 1)])
+def test_weekdays_match_the_calendar(first):
+    weekdays = parse_weekdays("Tue Thu Sun")
+    rule = RecurrenceRule("Gym", 60, weekdays, 18 * 60, first)
+    start = datetime.combine(first, datetime.min.time())
+    found = days(rule, start, start + timedelta(days=60))
+    expected = [start + timedelta(days=offset, hours=18) for offset in range(60)
+                if weekdays >> (first + timedelta(days=offset)).weekday() & 1]
+    assert found == expected
+
+
+def test_first_and_until_bound_the_occurrences():
+    rule = RecurrenceRule("Chem", 90, MON_WED_FRI, 9 * 60, date(2025, 1, 8),
+                          until=date(2025, 1, 17))
+    assert days(rule, datetime(2025, 1, 1), datetime(2025, 2, 1)) == [
+        datetime(2025, 1, day, 9) for day in (8, 10, 13, 15, 17)]
+
+
+def test_skip_and_override_single_days():
+    rule = RecurrenceRule("Chem", 90, MON_WED_FRI, 9 * 60, date(2025, 1, 6))
+    rule.skip(date(2025, 1, 8))
+    rule.override(date(2025, 1, 10), at=14 * 60, duration=30, task="Chem lab")
+    rows = list(rule.occurrences(to_minutes(datetime(2025, 1, 6)),
+                                 to_minutes(datetime(2025, 1, 11))))
+    assert [(from_minutes(begin), end - begin, task) for begin, end, task, _, _ in rows] == [
+        (datetime(2025, 1, 6, 9), 90, "Chem"),
+        (datetime(2025, 1, 10, 14), 30, "Chem lab"),
+    ]
+    with pytest.raises(ValueError):
+        rule.override(date(2025, 1, 13), weekdays=1)
+
+
+def test_occurrence_running_past_midnight_overlaps_the_next_day():
+    rule = RecurrenceRule("Night shift", 180, parse_weekdays("Mon"), 23 * 60, date(2025, 1, 6))
+    assert days(rule, datetime(2025, 1, 7), datetime(2025, 1, 8)) == [datetime(2025, 1, 6, 23)]
+    assert days(rule, datetime(2025, 1, 7, 2), datetime(2025, 1, 8)) == []
+
+    # An override longer than the rule's own duration widens the look-back.
+    rule.override(date(2025, 1, 13), duration=3 * 1440)
+    assert days(rule, datetime(2025, 1, 15), datetime(2025, 1, 16)) == [datetime(2025, 1, 13, 23)]
+
+
+def test_dict_round_trip():
+    rule = RecurrenceRule("Chem", 90, MON_WED_FRI, 9 * 60, date(2025, 1, 6),
+                          until=date(2025, 6, 30), priority="High", rid=4)
+    rule.skip(date(2025, 1, 8))
+    rule.override(date(2025, 1, 10), at=14 * 60, task="Chem lab")
+    copy = RecurrenceRule.from_dict(rule.to_dict(), rid=4)
+    for name in RecurrenceRule.__slots__:
+        assert getattr(copy, name) == getattr(rule, name)
+
+    forever = RecurrenceRule.from_dict(RecurrenceRule("Gym", 30, 1, 600, date(2025, 1, 6)).to_dict())
+    assert forever.until is None and forever.exceptions == set() and forever.overrides == {}
+
+
+def test_set_merges_rules_and_projects_a_window():
+    rules = RecurrenceSet()
+    gym = rules.add(RecurrenceRule("Gym", 60, parse_weekdays("Mon Tue"), 7 * 60, date(2025, 1, 6)))
+    chem = rules.add(RecurrenceRule("Chem", 90, MON_WED_FRI, 9 * 60, date(2025, 1, 6)))
+    starts = [begin for _, begin, *_ in rules.expand(to_minutes(datetime(2025, 1, 6)),
+                                                       to_minutes(datetime(2025, 1, 13)))]
+    assert starts == sorted(starts) and len(starts) == 5
+
+    schedule = Schedule()
+    own = schedule.add(datetime(2025, 1, 6, 12), 30, "Lunch")
+    rules.project(schedule, datetime(2025, 1, 6), datetime(2025, 1, 8))
+    assert len(schedule) == 4
+    rules.remove(gym)
+    rules.reproject(schedule)
+    assert [session.task for session in schedule.sessions()] == ["Chem", "Lunch"]
+    sid = schedule.projected()[0]
+    assert rules.occurrence_day(schedule, sid) == (rules.rules[chem], date(2025, 1, 6))
+    assert rules.occurrence_day(schedule, own) == (None, None)
+
+
+def test_reprojecting_reuses_ids_and_tracks_projected_sessions():
+    rules = RecurrenceSet()
+    rules.add(RecurrenceRule("Chem", 90, MON_WED_FRI, 9 * 60, date(2025, 1, 6)))
+    schedule = Schedule()
+    history = History(schedule)
+    schedule.add(datetime(2025, 1, 6, 12), 30, "Lunch")
+    rules.project(schedule, datetime(2025, 1, 6), datetime(2025, 1, 20))
+    size = len(schedule.raw_columns()['alive'])
+    for _ in range(100):
+        rules.reproject(schedule)
+    assert len(schedule.raw_columns()['alive']) == size
+
+    def scanned():
+        return [sid for sid in range(len(schedule.raw_columns()['alive']))
+                if sid in schedule and schedule.rule_of(sid) is not None]
+
+    assert schedule.projected() == scanned() and len(scanned()) == 6
+    schedule.clear()
+    assert schedule.projected() == []
+    history.undo()
+    assert schedule.projected() == scanned() and len(scanned()) == 6
+    with pytest.raises(ValueError):
+        with schedule.transaction():
+            schedule.remove(schedule.projected()[0])
+            raise ValueError
+    assert schedule.projected() == scanned() and len(scanned()) == 6
@@ -0,0 +1,147 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from schedule_core import MAX_DURATION, MAX_MINUTE, Schedule, from_minutes, parse_duration
+
+
+def test_out_of_range_start_leaves_schedule_untouched():
+    schedule = Schedule()
+    with pytest.raises(ValueError):
+        schedule.add(datetime(9000, 1, 1), 30, "Far future")
+    assert len(schedule) == 0
+    assert schedule.ids() == []
+    assert 0 not in schedule
+
+
+def test_out_of_range_start_rolls_back_transaction():
+    schedule = Schedule()
+    kept = schedule.add(datetime(2025, 1, 6, 9), 30, "Kept")
+    with pytest.raises(ValueError):
+        with schedule.transaction():
+            schedule.add(datetime(2025, 1, 6, 10), 30, "Dropped")
+            schedule.add(datetime(9000, 1, 1), 30, "Far future")
+    assert schedule.ids() == [kept]
+
+    with pytest.raises(ValueError):
+        schedule.update(kept, start=datetime(9000, 1, 1))
+    assert schedule.get(kept).start == datetime(2025, 1, 6, 9)
+    assert len(schedule) == 1
+
+
+def test_non_positive_duration_is_rejected():
+    schedule = Schedule()
+    with pytest.raises(ValueError):
+        schedule.add(datetime(2025, 1, 6, 9), 0, "Empty")
+    assert len(schedule) == 0
+
+
+def test_positional_queries_follow_start_order():
+    rng = random.Random(3)
+    schedule = Schedule()
+    base = datetime(2025, 1, 6)
+    for _ in range(500):
+        if len(schedule) and rng.random() < 0.3:
+            schedule.remove(rng.choice(schedule.ids()))
+        else:
+            schedule.add(base + timedelta(minutes=rng.randrange(5000)), 30, "Task")
+    expected = sorted(schedule.ids(), key=lambda sid: (schedule.get(sid).start, sid))
+    assert schedule.ids() == expected
+    assert [schedule.position(sid) for sid in expected] == list(range(len(expected)))
+    assert [schedule.session_at(index).id for index in range(len(expected))] == expected
+    assert schedule.session_at(-1).id == expected[-1]
+    for offset in (0, 7, len(expected) - 3, len(expected) + 5):
+        assert [session.id for session in schedule.window(offset, 10)] == expected[offset:offset + 10]
+    moment = base + timedelta(minutes=2500)
+    assert schedule.index_at(moment) == sum(schedule.get(sid).start < moment for sid in expected)
+    with pytest.raises(IndexError):
+        schedule.session_at(len(expected))
+
+
+def test_out_of_range_id_is_rejected():
+    schedule = Schedule()
+    kept = schedule.add(datetime(2025, 1, 6, 9), 30, "Kept")
+    for sid in (-1, 1 << 32):
+        with pytest.raises(ValueError):
+            schedule.add(datetime(2025, 1, 6, 10), 30, "Bad id", sid=sid)
+    assert schedule.ids() == [kept]
+    assert schedule.get(kept).task == "Kept"
+    assert schedule.add(datetime(2025, 1, 6, 10), 30, "Next") == kept + 1
+
+
+def test_overlong_session_is_rejected():
+    schedule = Schedule()
+    for duration in (MAX_DURATION + 1, 5 * 10 ** 9):
+        with pytest.raises(ValueError):
+            schedule.add(datetime(2026, 1, 1), duration, "Forever")
+        with pytest.raises(ValueError):
+            parse_duration(str(duration))
+    with pytest.raises(ValueError):
+        schedule.add(from_minutes(MAX_MINUTE - 10), 30, "Past the end")
+    assert len(schedule) == 0 and schedule.day_total(date(2026, 1, 1)) == 0
+
+    sid = schedule.add(datetime(2026, 1, 1), MAX_DURATION, "Month")
+    with pytest.raises(ValueError):
+        schedule.update(sid, duration=MAX_DURATION + 1)
+    assert schedule.get(sid).duration == MAX_DURATION
+    assert parse_duration(str(MAX_DURATION)) == MAX_DURATION
+
+
+def brute_day_totals(schedule):
+    totals = defaultdict(int)
+    for begin, end, _, _, category in schedule.rows():
+        moment, finish = from_minutes(begin), from_minutes(end)
+        while moment < finish:
+            midnight = datetime.combine(moment.date() + timedelta(days=1), datetime.min.time())
+            totals[moment.date(), category] += int((min(finish, midnight) - moment).total_seconds() // 60)
+            moment = midnight
+    return totals
+
+
+def sums(schedule, field):
+    totals = defaultdict(int)
+    for begin, end, *labels in schedule.rows():
+        totals[labels[field]] += end - begin
+    return dict(totals)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_running_totals_match_brute_force(seed):
+    rng = random.Random(seed)
+    schedule = Schedule()
+    base = datetime(1969, 12, 28, 20) if seed % 2 else datetime(2025, 1, 6, 20)
+    days = [base.date() + timedelta(days=offset) for offset in range(-1, 8)]
+
+    def moment():
+        return base + timedelta(minutes=rng.randrange(0, 5 * 1440, 15))
+
+    for step in range(300):
+        choice = rng.random()
+        if choice < 0.4 or not len(schedule):
+            schedule.add(moment(), rng.choice((15, 90, 300, 1500)), "Task",
+                         rng.choice(("High", "Low")), rng.choice(("Study", "Food Break")))
+        elif choice < 0.6:
+            schedule.remove(rng.choice(schedule.ids()))
+        elif choice < 0.8:
+            schedule.update(rng.choice(schedule.ids()), start=moment(),
+                            duration=rng.choice((30, 700, 2000)), category="Study")
+        elif choice < 0.9:
+            with pytest.raises(RuntimeError):
+                with schedule.transaction():
+                    schedule.add(moment(), 1500, "Rolled back", "High", "Study")
+                    schedule.remove(rng.choice(schedule.ids()))
+                    raise RuntimeError
+        elif choice < 0.93:
+            schedule.clear()
+
+        expected = brute_day_totals(schedule)
+        for day in days:
+            for category in ("Study", "Food Break"):
+                assert schedule.day_total(day, category) == expected.get((day, category), 0)
+            assert schedule.day_total(day) == sum(expected.get((day, category), 0)
+                                                  for category in ("Study", "Food Break"))
+            assert schedule.progress(day) == min(1.0, expected.get((day, "Study"), 0) / 360)
+        assert schedule.category_totals() == sums(schedule, 2)
+        assert schedule.priority_totals() == sums(schedule, 1)
@@ -0,0 +1,115 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from schedule_core import Schedule
+from schedule_io import (ImportReport, _ics_duration, import_batches, read_csv, read_ics,
+                         write_csv, write_ics)
+
+
+def ics(*events):
+    body = "".join(f"BEGIN:VEVENT\r\n{event}END:VEVENT\r\n" for event in events)
+    return io.StringIO(f"BEGIN:VCALENDAR\r\n{body}END:VCALENDAR\r\n")
+
+
+def test_csv_rows_are_parsed_and_bad_ones_reported():
+    stream = io.StringIO(
+        "start,duration,task,priority,category\n"
+        "2025-01-06 09:00,30,Maths,high,Study\n"
+        ",15,Water,,Water Break\n"
+        "2025-01-06 10:00,0,Empty,Low,Study\n"
+        "9999-01-06 09:00,30,Far,Low,Study\n"
+        "2025-01-06 11:00,30,,Low,Study\n"
+        "2025-01-06 12:00,45,Physics,urgent,\n")
+    report = ImportReport()
+    records = list(read_csv(stream, report))
+    assert records == [
+        (datetime(2025, 1, 6, 9), 30, "Maths", "High", "Study"),
+        (None, 15, "Water", "Medium", "Water Break"),
+        (datetime(2025, 1, 6, 12), 45, "Physics", "Medium", "Study"),
+    ]
+    assert report.skipped == 3
+    assert [line for line, _ in report.errors] == [4, 5, 6]
+
+
+def test_out_of_range_row_does_not_abort_the_import():
+    schedule = Schedule()
+    report = ImportReport()
+    stream = io.StringIO("start,duration,task\n"
+                         "2025-01-06 09:00,30,A\n"
+                         "9999-01-06 09:00,30,Far\n"
+                         "2025-01-06 10:00,30,B\n")
+    for _ in import_batches(schedule, read_csv(stream, report), report):
+        pass
+    assert (report.added, report.skipped) == (2, 1)
+    assert [session.task for session in schedule.sessions()] == ["A", "B"]
+
+
+def test_ics_folded_lines_and_escapes_are_joined():
+    report = ImportReport()
+    stream = ics("DTSTART:20250106T090000\r\n"
+                 "DTEND:20250106T100000\r\n"
+                 "SUMMARY:Read chapter 3\\, then\r\n"
+                 "  summarise\r\n"
+                 "CATEGORIES:Study,Reading\r\n")
+    assert list(read_ics(stream, report)) == [
+        (datetime(2025, 1, 6, 9), 60, "Read chapter 3, then summarise", "Medium", "Study")]
+    assert report.skipped == 0
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("PT45M", timedelta(minutes=45)),
+    ("PT1H30M", timedelta(minutes=90)),
+    ("P1D", timedelta(days=1)),
+    ("P1W", timedelta(weeks=1)),
+    ("P1DT2H", timedelta(days=1, hours=2)),
+    ("-PT15M", -timedelta(minutes=15)),
+])
+def test_ics_duration(value, expected):
+    assert _ics_duration(value) == expected
+
+
+def test_ics_duration_rejects_garbage():
+    with pytest.raises(ValueError):
+        _ics_duration("90 minutes")
+
+
+def test_ics_times_durations_and_priorities():
+    report = ImportReport()
+    stream = ics("DTSTART:20250106T140000Z\r\nDURATION:PT45M\r\nSUMMARY:Utc\r\nPRIORITY:2\r\n",
+                 "DTSTART;VALUE=DATE:20250107\r\nSUMMARY:All day\r\nPRIORITY:9\r\n",
+                 "DTSTART:20250108T090000\r\nDURATION:-PT10M\r\nSUMMARY:Backwards\r\n",
+                 "DTSTART:99990108T090000\r\nDURATION:PT10M\r\nSUMMARY:Far\r\n",
+                 "SUMMARY:No start\r\n",
+                 "DTSTART:20250109T090000\r\nDURATION:PT30M\r\nPRIORITY:5\r\n")
+    utc = (datetime(2025, 1, 6, 14, tzinfo=timezone.utc).astimezone()
+           .replace(tzinfo=None))
+    assert list(read_ics(stream, report)) == [
+        (utc, 45, "Utc", "High", "Study"),
+        (datetime(2025, 1, 7), 1440, "All day", "Low", "Study"),
+        (datetime(2025, 1, 9, 9), 30, "Untitled", "Medium", "Study"),
+    ]
+    assert report.skipped == 3
+
+
+def test_csv_to_ics_to_csv_round_trip():
+    source = Schedule()
+    source.add(datetime(2025, 1, 6, 9), 30, "Maths, part 1", "High", "Study")
+    source.add(datetime(2025, 1, 6, 23, 30), 90, "Late; reading", "Low", "Study")
+    source.add(datetime(2025, 1, 7, 8), 15, "Water", "Medium", "Water Break")
+    exported = io.StringIO()
+    write_csv(source, exported)
+
+    via_csv = Schedule()
+    report = ImportReport()
+    via_csv.add_many(read_csv(io.StringIO(exported.getvalue()), report))
+    calendar = io.StringIO()
+    write_ics(via_csv, calendar)
+
+    via_ics = Schedule()
+    via_ics.add_many(read_ics(io.StringIO(calendar.getvalue()), report))
+    result = io.StringIO()
+    write_csv(via_ics, result)
+    assert report.skipped == 0
+    assert result.getvalue() == exported.getvalue()
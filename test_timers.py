@@ -0,0 +1,135 @@
+from timers import PAUSED, RINGING, RUNNING, AfterDriver, TimerService
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def service():
+    clock = Clock()
+    expired = []
+    return TimerService(on_expire=expired.append, clock=clock), clock, expired
+
+
+def test_timers_expire_in_deadline_order():
+    timers, clock, expired = service()
+    late = timers.start(60, "late")
+    early = timers.start(30, "early")
+    assert timers.poll() == []
+    clock.now += 45
+    assert [timer.id for timer in timers.poll()] == [early]
+    assert timers.get(early).state == RINGING
+    assert timers.remaining(early) == 0
+    assert timers.remaining(late) == 15
+    clock.now += 15
+    assert [timer.id for timer in timers.poll()] == [late]
+    assert [timer.label for timer in expired] == ["early", "late"]
+
+
+def test_pause_keeps_remaining_time_until_resumed():
+    timers, clock, expired = service()
+    tid = timers.start(60)
+    clock.now += 20
+    timers.pause(tid)
+    assert timers.get(tid).state == PAUSED
+    clock.now += 500
+    assert timers.remaining(tid) == 40
+    assert timers.poll() == []
+    assert timers.next_deadline() is None
+
+    timers.resume(tid)
+    assert timers.remaining(tid) == 40
+    clock.now += 39
+    assert timers.poll() == []
+    clock.now += 1
+    assert [timer.id for timer in timers.poll()] == [tid]
+
+
+def test_snooze_running_paused_and_ringing_timers():
+    timers, clock, expired = service()
+    running = timers.start(30)
+    paused = timers.start(30)
+    ringing = timers.start(10)
+    timers.pause(paused)
+    clock.now += 10
+    timers.poll()
+    assert timers.get(ringing).state == RINGING
+
+    timers.snooze(running, 60)
+    timers.snooze(paused, 60)
+    timers.snooze(ringing, 60)
+    assert timers.remaining(running) == 80
+    assert timers.remaining(paused) == 90
+    assert timers.get(ringing).state == RUNNING
+    assert timers.remaining(ringing) == 60
+
+    clock.now += 60
+    assert [timer.id for timer in timers.poll()] == [ringing]
+    clock.now += 20
+    assert [timer.id for timer in timers.poll()] == [running]
+    assert timers.get(paused).state == PAUSED
+
+
+def test_stale_heap_entries_are_skipped():
+    timers, clock, expired = service()
+    cancelled = timers.start(10)
+    snoozed = timers.start(20)
+    paused = timers.start(5)
+    timers.cancel(cancelled)
+    timers.snooze(snoozed, 100)
+    timers.pause(paused)
+    assert timers.next_deadline() == clock.now + 120
+
+    clock.now += 60
+    assert timers.poll() == []
+    clock.now += 60
+    assert [timer.id for timer in timers.poll()] == [snoozed]
+    assert timers.next_deadline() is None
+    assert [timer.id for timer in expired] == [snoozed]
+
+
+def test_ids_are_not_reused_after_expiry():
+    timers, clock, expired = service()
+    first = timers.start(10)
+    clock.now += 10
+    timers.poll()
+    timers.dismiss(first)
+    assert len(timers) == 0
+
+    second = timers.start(30)
+    assert second != first
+    clock.now += 10
+    assert timers.poll() == []
+    timers.dismiss(second)
+    assert timers.get(second).state == RUNNING
+    clock.now += 20
+    assert [timer.id for timer in timers.poll()] == [second]
+
+
+def test_after_driver_keeps_one_wakeup_armed():
+    timers, clock, expired = service()
+    pending = {}
+    handles = iter(range(1000))
+
+    def after(ms, callback):
+        handle = next(handles)
+        pending[handle] = (ms, callback)
+        return handle
+
+    AfterDriver(timers, after, pending.pop)
+    tid = timers.start(30)
+    timers.start(90)
+    assert [ms for ms, _ in pending.values()] == [30001]
+
+    timers.cancel(tid)
+    assert [ms for ms, _ in pending.values()] == [90001]
+    clock.now += 90
+    (handle, (_, fire)), = pending.items()
+    del pending[handle]
+    fire()
+    assert len(expired) == 1
+    assert pending == {}
@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import threading
+import time
+
+from metrics import timed
+
+# All timers share one min-heap of deadlines. A driver (the Tk loop via
+# AfterDriver, or a single ThreadDriver worker) sleeps until the earliest
+# deadline and then calls poll(); no timer owns a thread or polls per second.
+
+RUNNING = 'running'
+PAUSED = 'paused'
+RINGING = 'ringing'
+
+
+class Timer:
+    __slots__ = ('id', 'label', 'duration', 'deadline', 'remaining', 'state')
+
+    def __init__(self, tid, label, duration, deadline):
+        self.id = tid
+        self.label = label
+        self.duration = duration
+        self.deadline = deadline
+        self.remaining = None
+        self.state = RUNNING
+
+
+class TimerService:
+    def __init__(self, on_expire=None, clock=time.monotonic):
+        self.on_expire = on_expire
+        self.clock = clock
+        self._timers = {}
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._waker = None
+
+    def set_waker(self, waker):
+        # Called with no arguments whenever the earliest deadline may have
+        # moved, so the driver can re-arm its single wakeup.
+        self._waker = waker
+
+    def _wake(self):
+        if self._waker is not None:
+            self._waker()
+
+    def _push(self, timer):
+        heapq.heappush(self._heap, (timer.deadline, timer.id))
+
+    def start(self, seconds, label=""):
+        tid = next(self._ids)
+        timer = Timer(tid, label, seconds, self.clock() + seconds)
+        self._timers[tid] = timer
+        self._push(timer)
+        self._wake()
+        return tid
+
+    def get(self, tid):
+        return self._timers[tid]
+
+    def timers(self):
+        return list(self._timers.values())
+
+    def __len__(self):
+        return len(self._timers)
+
+    def remaining(self, tid, now=None):
+        timer = self._timers[tid]
+        if timer.state == PAUSED:
+            return timer.remaining
+        if timer.state == RINGING:
+            return 0
+        return max(0, timer.deadline - (self.clock() if now is None else now))
+
+    def cancel(self, tid):
+        # Heap entries for removed timers are skipped lazily in poll().
+        timer = self._timers.pop(tid)
+        self._wake()
+        return timer
+
+    def dismiss(self, tid):
+        if self._timers.get(tid) is not None and self._timers[tid].state == RINGING:
+            del self._timers[tid]
+
+    def pause(self, tid):
+        timer = self._timers[tid]
+        if timer.state == RUNNING:
+            timer.remaining = max(0, timer.deadline - self.clock())
+            timer.state = PAUSED
+            self._wake()
+
+    def resume(self, tid):
+        timer = self._timers[tid]
+        if timer.state == PAUSED:
+            timer.deadline = self.clock() + timer.remaining
+            timer.remaining = None
+            timer.state = RUNNING
+            self._push(timer)
+            self._wake()
+
+    def snooze(self, tid, seconds):
+        # Pushes a running timer back, or re-arms one that is ringing.
+        timer = self._timers[tid]
+        if timer.state == PAUSED:
+            timer.remaining += seconds
+            return
+        if timer.state == RINGING:
+            timer.deadline = self.clock() + seconds
+            timer.state = RUNNING
+        else:
+            timer.deadline += seconds
+        self._push(timer)
+        self._wake()
+
+    def next_deadline(self):
+        heap = self._heap
+        while heap:
+            deadline, tid = heap[0]
+            timer = self._timers.get(tid)
+            if timer is not None and timer.state == RUNNING and timer.deadline == deadline:
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    @timed("timers.poll")
+    def poll(self, now=None):
+        now = self.clock() if now is None else now
+        expired = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            tid = heapq.heappop(self._heap)[1]
+            timer = self._timers[tid]
+            timer.state = RINGING
+            expired.append(timer)
+
+        for timer in expired:
+            if self.on_expire is not None:
+                self.on_expire(timer)
+        return expired
+
+
+class AfterDriver:
+    # Drives a TimerService from an event loop with Tk-style after() and
+    # after_cancel() calls.
+    def __init__(self, service, after, after_cancel):
+        self.service = service
+        self.after = after
+        self.after_cancel = after_cancel
+        self._handle = None
+        service.set_waker(self.reschedule)
+
+    def reschedule(self):
+        if self._handle is not None:
+            self.after_cancel(self._handle)
+            self._handle = None
+        deadline = self.service.next_deadline()
+        if deadline is not None:
+            delay = max(0, deadline - self.service.clock())
+            self._handle = self.after(int(delay * 1000) + 1, self._fire)
+
+    def _fire(self):
+        self._handle = None
+        self.service.poll()
+        self.reschedule()
+
+
+class ThreadDriver:
+    # Drives a TimerService from one worker thread for headless use. Calls
+    # into the service from other threads must hold `lock`.
+    def __init__(self, service):
+        self.service = service
+        self.lock = threading.RLock()
+        self._changed = threading.Condition(self.lock)
+        self._stopped = False
+        service.set_waker(self._changed.notify)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self.lock:
+            self._stopped = True
+            self._changed.notify()
+        self._thread.join()
+
+    def _run(self):
+        with self.lock:
+            while not self._stopped:
+                self.service.poll()
+                deadline = self.service.next_deadline()
+                timeout = None if deadline is None else max(0, deadline - self.service.clock())
+                self._changed.wait(timeout)
+
+
+class AsyncioDriver(AfterDriver):
+    # Drives a TimerService from a running asyncio event loop.
+    def __init__(self, service, loop):
+        super().__init__(service, lambda ms, callback: loop.call_later(ms / 1000, callback),
+                         lambda handle: handle.cancel())
@@ -0,0 +1,43 @@
+import queue
+
+from metrics import timed
+
+# Tk widgets may only be touched from the thread running mainloop(). Any
+# other thread posts a callback here instead, and the Tk loop runs the
+# queued callbacks in batches from a single after() poll.
+
+
+class UIEventQueue:
+    def __init__(self, interval_ms=100, max_batch=500):
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._after = None
+
+    def post(self, callback, *args):
+        self._queue.put((callback, args))
+
+    def attach(self, root):
+        self._after = root.after
+        self._after(self.interval_ms, self._drain)
+
+    @timed("ui.drain")
+    def drain(self):
+        handled = 0
+        while handled < self.max_batch:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+            handled += 1
+        return handled
+
+    def _drain(self):
+        handled = 0
+        try:
+            handled = self.drain()
+        finally:
+            # Come straight back if the batch limit left work queued
+            delay = 1 if handled >= self.max_batch else self.interval_ms
+            self._after(delay, self._drain)